@@ -0,0 +1,106 @@
+import os
+
+
+SYLLABLES = ["ka", "ki", "ku", "ke", "ko", "sa", "shi", "su", "se", "so", "ta", "chi", "tsu", "te", "to",
+             "na", "ni", "nu", "ne", "no", "ha", "hi", "fu", "he", "ho", "ma", "mi", "mu", "me", "mo",
+             "ra", "ri", "ru", "re", "ro"]
+PLATFORMS = ["TV", "TV", "剧场版", "OVA"]
+LINK_SIZE = 3  # 每个关联图中的动画数量
+
+
+def romajiTitle(index):
+    """
+    :param index: 动画序号
+    :return: 由序号唯一确定的罗马名，如 Kakaka Kakaki
+    """
+    digits = []
+    for _ in range(6):
+        index, digit = divmod(index, len(SYLLABLES))
+        digits.append(SYLLABLES[digit])
+    return "".join(digits[:3]).capitalize() + " " + "".join(digits[3:]).capitalize()
+
+
+def nativeTitle(index):
+    """
+    :param index: 动画序号
+    :return: 动画日文名
+    """
+    return f"ベンチマーク{index}号"
+
+
+def subjectId(index):
+    """
+    :param index: 动画序号
+    :return: Bangumi ID
+    """
+    return 100000 + index
+
+
+def mapId(index):
+    """
+    :param index: 动画序号
+    :return: 动画所在的 bangumi-link 关联图ID
+    """
+    return index // LINK_SIZE + 1
+
+
+def subjectJson(index):
+    """
+    :param index: 动画序号
+    :return: 与 api.bgm.tv/v0/subjects 格式相同的条目
+    """
+    subject_id = subjectId(index)
+    return {
+        "id": subject_id,
+        "name": nativeTitle(index),
+        "name_cn": f"基准动画{index}",
+        "platform": PLATFORMS[index % len(PLATFORMS)],
+        "date": f"20{10 + index % 15}-{1 + index % 12:02d}-{1 + index % 28:02d}",
+        "eps": 12,
+        "rating": {"score": 5 + index % 50 / 10},
+        "infobox": [
+            {"key": "中文名", "value": f"基准动画{index}"},
+            {"key": "放送开始", "value": "2020年1月8日"},
+            {"key": "播放结束", "value": "2020年3月25日"},
+            {"key": "放送星期", "value": ["星期一", "星期三", "星期六"][index % 3]}
+        ],
+        "images": {"medium": f"https://lain.bgm.tv/pic/cover/m/{subject_id}.jpg"}
+    }
+
+
+def linkNode(index):
+    """
+    :param index: 动画序号
+    :return: bangumi-link 关联图中的节点
+    """
+    subject = subjectJson(index)
+    return {"id": subject["id"], "name": subject["name"], "nameCN": subject["name_cn"],
+            "type": 2, "platform": subject["platform"], "date": subject["date"]}
+
+
+def folderName(index, title_count):
+    """
+    :param index: 文件夹序号
+    :param title_count: 不同动画的数量，超出时重复使用已有的动画
+    :return: 动画文件夹名，如 [BenchSubs] Kakaka Kakaki [BDRip 1080p]
+    """
+    copy, title_index = divmod(index, title_count)
+    group = f"BenchSubs{copy}" if copy else "BenchSubs"
+    return f"[{group}] {romajiTitle(title_index)} [BDRip 1080p]"
+
+
+def createLibrary(root, count, title_count=None):
+    """
+    在root中创建动画文件夹
+    :param root: 动画库目录
+    :param count: 文件夹数量
+    :param title_count: 不同动画的数量，默认每个文件夹都是不同的动画
+    :return: 文件夹路径列表
+    """
+    title_count = title_count or count
+    path_list = []
+    for index in range(count):
+        path = os.path.join(root, folderName(index, title_count))
+        os.mkdir(path)
+        path_list.append(path)
+    return path_list
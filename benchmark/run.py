@@ -0,0 +1,210 @@
+"""
+离线基准测试：在本地回放线上服务的响应，分析合成的动画库并统计吞吐量、各阶段延迟与内存峰值
+
+    python -m benchmark.run [--sizes 100 1000 10000] [--latency 20] [--error-rate 0.01]
+
+每个规模在单独的子进程中运行，使用临时的配置文件夹，不读写本机的缓存与配置
+"""
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import subprocess
+
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmark.library import createLibrary
+from benchmark.server import ReplayServer
+
+
+STAGES = ["prefetch", "romaji", "anilist", "bangumi_id", "subject", "link", "poster", "final"]
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(prog="benchmark", description="BangumiRenamer 离线基准测试")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="动画文件夹数量")
+    parser.add_argument("--titles", type=float, default=1.0, help="不同动画占文件夹数量的比例，小于1时部分文件夹为同一动画")
+    parser.add_argument("--runner", choices=["engine", "start"], default="engine",
+                        help="engine: 使用AnalysisEngine(与图形界面和命令行相同)；start: 在线程池中直接调用Analysis.start")
+    parser.add_argument("--workers", type=int, default=8, help="runner为start时的线程数量")
+    parser.add_argument("--latency", type=float, default=20, help="每个请求的固定延迟(毫秒)")
+    parser.add_argument("--jitter", type=float, default=0, help="随机延迟上限(毫秒)")
+    parser.add_argument("--error-rate", type=float, default=0, help="返回错误的请求比例")
+    parser.add_argument("--error-status", type=int, default=503, help="模拟错误时的状态码")
+    parser.add_argument("--rate-limit", action="store_true", help="保留线上服务的限速，默认不限速")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--json", action="store_true", help="以JSON Lines格式输出结果")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)  # 子进程中运行的规模
+    return parser.parse_args(argv)
+
+
+def percentile(values, p):
+    """
+    :param values: 已排序的数值列表
+    :param p: 百分位，如 50、99
+    :return: 最近秩法计算的百分位数
+    """
+    if not values:
+        return None
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def peakRss():
+    """
+    :return: 当前进程的内存峰值(MB)，不支持的系统返回None
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def timed(timings, name, func):
+    """
+    :return: 记录每次调用耗时的func
+    """
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[name].append(time.perf_counter() - start)
+    return wrapper
+
+
+def runWorker(args):
+    """
+    在子进程中运行单个规模的测试，结果以一行JSON输出到stdout，其他打印内容转到stderr
+    """
+    stdout, sys.stdout = sys.stdout, sys.stderr
+
+    # 配置文件夹已由父进程通过环境变量指定，此时才导入程序模块
+    from src.module import analysis as analysis_module
+    from src.module import engine as engine_module
+    from src.module.analysis import Analysis
+    from src.module.api.client import client
+    from src.module.api.ratelimit import RateLimiter
+    from src.module.data import appendAnimeData
+    from src.module.scanner import scanLibrary
+    from src.module.template import renameTemplate
+
+    size = args.worker
+    title_count = max(1, int(size * args.titles))
+    timings = {stage: [] for stage in STAGES}
+
+    class TimedAnalysis(Analysis):
+        def prefetch(self, anime_list):
+            timed(timings, "prefetch", super().prefetch)(anime_list)
+
+        def runStage(self, anime, number, text, stage):
+            name = STAGES[number]
+            return timed(timings, name, super().runStage)(anime, number, text, stage)
+
+    for module in (analysis_module, engine_module):
+        module.downloadPoster = timed(timings, "poster", module.downloadPoster)
+        module.getFinal = timed(timings, "final", module.getFinal)
+
+    server = ReplayServer(title_count, args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+    server.start()
+    server.install(client)
+    if not args.rate_limit:
+        client.limiter = RateLimiter({})
+
+    with tempfile.TemporaryDirectory() as root:
+        createLibrary(root, size, title_count)
+        _, anime_list = appendAnimeData(0, [], scanLibrary(root, 1), checked=True)
+
+        analysis = TimedAnalysis()
+        start = time.perf_counter()
+        if args.runner == "engine":
+            engine = engine_module.AnalysisEngine(analysis)
+            engine.submitBatch(anime_list)
+            engine.join()
+        else:
+            analysis.prefetch(anime_list)
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(analysis.start, anime_list))
+        seconds = time.perf_counter() - start
+
+        # 修改命名格式后重新生成全部重命名结果的耗时
+        start = time.perf_counter()
+        renameTemplate().applyAll(anime_list)
+        template_seconds = time.perf_counter() - start
+
+    server.stop()
+
+    analysed = sum(1 for anime in anime_list if anime["final_name"])
+    result = {
+        "size": size,
+        "runner": args.runner,
+        "seconds": round(seconds, 3),
+        "throughput": round(size / seconds, 1),
+        "analysed": analysed,
+        "failed": size - analysed,
+        "template_seconds": round(template_seconds, 4),
+        "requests": server.requests,
+        "injected_errors": server.errors,
+        "stages": {},
+        "peak_rss_mb": round(peakRss(), 1) if peakRss() is not None else None,
+    }
+    for stage in STAGES:
+        values = sorted(timings[stage])
+        result["stages"][stage] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 99) * 1000, 2) if values else None,
+        }
+
+    stdout.write(json.dumps(result, ensure_ascii=False) + "\n")
+    stdout.flush()
+
+
+def printResult(result):
+    """
+    以表格形式输出单个规模的结果
+    """
+    print(f"\n== {result['size']} 个文件夹 ({result['runner']}) ==")
+    print(f"耗时 {result['seconds']}s，吞吐量 {result['throughput']} 个/秒，"
+          f"成功 {result['analysed']}，失败 {result['failed']}，内存峰值 {result['peak_rss_mb']} MB")
+    print(f"重新生成重命名结果 {result['template_seconds']}s，"
+          f"请求 {result['requests']}，注入错误 {result['injected_errors']}")
+    print(f"{'阶段':<12}{'次数':>8}{'p50(ms)':>12}{'p99(ms)':>12}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<12}{stats['count']:>8}{str(stats['p50_ms']):>12}{str(stats['p99_ms']):>12}")
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    if args.worker is not None:
+        runWorker(args)
+        return 0
+
+    argv = sys.argv[1:] if argv is None else list(argv)
+    exit_code = 0
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as config_path:
+            env = dict(os.environ, BANGUMI_RENAMER_CONFIG=config_path)
+            process = subprocess.run([sys.executable, "-m", "benchmark.run", *argv, "--worker", str(size)],
+                                     env=env, stdout=subprocess.PIPE, text=True)
+
+        if process.returncode != 0 or not process.stdout.strip():
+            print(f"规模 {size} 运行失败，退出码 {process.returncode}", file=sys.stderr)
+            exit_code = 1
+            continue
+
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False))
+        else:
+            printResult(result)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import json
+import time
+import random
+import hashlib
+import threading
+
+from urllib.parse import unquote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmark.library import LINK_SIZE, romajiTitle, nativeTitle, subjectId, mapId, subjectJson, linkNode
+
+
+# 本地服务器的路径前缀: 被替换的主机
+SERVICES = {
+    "anilist": "graphql.anilist.co",
+    "bgm": "api.bgm.tv",
+    "jsdelivr": "cdn.jsdelivr.net",
+    "lain": "lain.bgm.tv",
+}
+POSTER_SIZE = 32 * 1024  # 每张海报的字节数
+
+
+class ReplayServer:
+    def __init__(self, title_count, latency=0, jitter=0, error_rate=0, error_status=503, seed=0):
+        """
+        在本地回放 AniList、api.bgm.tv、bangumi-link 与海报图片的响应，响应格式与线上服务相同，
+        内容由动画序号生成。可模拟网络延迟与服务器错误
+        :param title_count: 可查询的动画数量
+        :param latency: 每个请求的固定延迟(毫秒)
+        :param jitter: 在固定延迟上增加的随机延迟上限(毫秒)
+        :param error_rate: 返回错误的请求比例
+        :param error_status: 模拟错误时的状态码
+        :param seed: 随机数种子
+        """
+        self.title_count = title_count
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.requests = {name: 0 for name in SERVICES}
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._romaji = {romajiTitle(index).casefold(): index for index in range(title_count)}
+        self._native = {nativeTitle(index): index for index in range(title_count)}
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """
+        在子线程中启动服务器，端口由系统分配
+        """
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 保持长连接，与线上服务一致
+
+            def do_GET(self):
+                replay.handle(self, None)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                replay.handle(self, body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def install(self, client):
+        """
+        将HttpClient对线上服务的请求转发到本服务器
+        :param client: HttpClient
+        """
+        for prefix, host in SERVICES.items():
+            client.overrideHost(host, f"{self.base_url}/{prefix}")
+
+    def handle(self, request, body):
+        """
+        按路径前缀分发请求，先模拟延迟与错误
+        """
+        path = unquote(urlsplit(request.path).path)
+        service, _, path = path.lstrip("/").partition("/")
+
+        with self._lock:
+            if service in self.requests:
+                self.requests[service] += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self.send(request, self.error_status, {"error": "injected"})
+
+        handler = {
+            "anilist": self.anilist,
+            "bgm": self.bangumi,
+            "jsdelivr": self.bangumiLink,
+            "lain": self.poster,
+        }.get(service)
+        if handler is None:
+            return self.send(request, 404, {"error": "Not Found"})
+        handler(request, "/" + path, body)
+
+    @staticmethod
+    def send(request, status, content, content_type="application/json; charset=utf-8"):
+        if not isinstance(content, bytes):
+            content = json.dumps(content, ensure_ascii=False).encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(content)))
+        request.end_headers()
+        request.wfile.write(content)
+
+    def media(self, romaji_name):
+        index = self._romaji.get((romaji_name or "").strip().casefold())
+        if index is None:
+            return None
+        return {"title": {"native": nativeTitle(index)}}
+
+    def anilist(self, request, path, body):
+        """
+        GraphQL查询，支持单个查询(变量id)与带别名的批量查询
+        """
+        variables = json.loads(body or b"{}").get("variables") or {}
+        if "id" in variables:
+            media = self.media(variables["id"])
+            if media is None:
+                return self.send(request, 404, {"data": {"Media": None}, "errors": [{"message": "Not Found.", "status": 404}]})
+            return self.send(request, 200, {"data": {"Media": media}})
+
+        data = {alias: self.media(name) for alias, name in variables.items()}
+        if None in data.values():
+            return self.send(request, 404, {"data": data, "errors": [{"message": "Not Found.", "status": 404}]})
+        self.send(request, 200, {"data": data})
+
+    def bangumi(self, request, path, body):
+        """
+        /search/subject/{日文名} 与 /v0/subjects/{Bangumi ID}
+        """
+        if path.startswith("/search/subject/"):
+            index = self._native.get(path[len("/search/subject/"):].strip())
+            if index is None:
+                return self.send(request, 404, {"code": 404, "error": "Not Found"})
+            return self.send(request, 200, {"results": 1, "list": [{"id": subjectId(index), "name": nativeTitle(index)}]})
+
+        if path.startswith("/v0/subjects/"):
+            index = int(path.rsplit("/", 1)[1]) - subjectId(0)
+            if 0 <= index < self.title_count:
+                return self.send(request, 200, subjectJson(index))
+
+        self.send(request, 404, {"title": "Not Found"})
+
+    def bangumiLink(self, request, path, body):
+        """
+        /gh/ekibot/bangumi-link/node/{分组}/{Bangumi ID} 与 /gh/ekibot/bangumi-link/map/{分组}/{关联图ID}.json
+        """
+        parts = path.strip("/").split("/")
+        if len(parts) == 6 and parts[3] == "node":
+            index = int(parts[5]) - subjectId(0)
+            if 0 <= index < self.title_count:
+                return self.send(request, 200, str(mapId(index)).encode("utf-8"), "text/plain; charset=utf-8")
+
+        if len(parts) == 6 and parts[3] == "map":
+            first = (int(parts[5].split(".")[0]) - 1) * LINK_SIZE
+            nodes = [linkNode(index) for index in range(first, min(first + LINK_SIZE, self.title_count))]
+            if nodes:
+                return self.send(request, 200, {"id": parts[5].split(".")[0], "node": nodes})
+
+        self.send(request, 404, b"Not Found", "text/plain; charset=utf-8")
+
+    def poster(self, request, path, body):
+        """
+        /pic/cover/m/{Bangumi ID}.jpg，内容由ID生成，不同海报的内容不同
+        """
+        seed = hashlib.sha256(path.encode("utf-8")).digest()
+        self.send(request, 200, seed * (POSTER_SIZE // len(seed)), "image/jpeg")
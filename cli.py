@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import argparse
+import threading
+import multiprocessing
+
+from src.module.data import appendAnimeData
+from src.module.scanner import scanLibrary
+from src.module.analysis import Analysis
+from src.module.engine import AnalysisEngine
+from src.module.rename import Rename, PARALLELISM
+from src.module.api.link_index import importBangumiLink
+from src.module.api.subject_store import importBangumiArchive
+
+
+# 退出码
+EXIT_OK = 0
+EXIT_ANALYSIS_FAILED = 1  # 存在分析失败的动画(其余动画仍会输出或重命名)
+EXIT_USAGE = 2  # 参数错误(argparse 默认)
+EXIT_CHECK_FAILED = 3  # 没有可用的动画，或不满足重命名条件
+EXIT_RENAME_FAILED = 4  # 重命名过程中出错
+
+
+class Output:
+    def __init__(self, json_lines):
+        """
+        命令行输出。JSON Lines模式下，stdout只输出JSON，其他打印内容转到stderr
+        :param json_lines: 是否输出JSON Lines
+        """
+        self.json_lines = json_lines
+        self._lock = threading.Lock()
+        self._stdout = sys.stdout
+
+        if json_lines:
+            sys.stdout = sys.stderr
+
+    def event(self, event, text, **data):
+        """
+        输出一条进度或结果
+        :param event: 事件类型
+        :param text: 普通模式下输出的文字，为None时不输出
+        :param data: JSON Lines模式下输出的内容
+        """
+        with self._lock:
+            if self.json_lines:
+                self._stdout.write(json.dumps({"event": event, **data}, ensure_ascii=False) + "\n")
+                self._stdout.flush()
+            elif text is not None:
+                self._stdout.write(text + "\n")
+
+
+def parseArgs(argv):
+    parser = argparse.ArgumentParser(prog="bangumi-renamer", description="BangumiRenamer 命令行模式")
+    parser.add_argument("folders", nargs="*", help="动画文件夹，或配合--depth使用的动画库目录")
+    parser.add_argument("--depth", type=int, default=0, help="动画文件夹相对于给定目录的深度，默认为0")
+    parser.add_argument("--apply", action="store_true", help="执行重命名，默认仅输出重命名结果")
+    parser.add_argument("--json", action="store_true", help="以JSON Lines格式输出进度与结果")
+    parser.add_argument("--quiet", action="store_true", help="不输出分析进度")
+    parser.add_argument("--jobs", type=int, default=PARALLELISM, help=f"同时重命名的文件夹数量，默认为{PARALLELISM}")
+    parser.add_argument("--resume", action="store_true", help="继续上次中断的重命名")
+    parser.add_argument("--rollback", action="store_true", help="撤销上次中断的重命名中已完成的部分")
+    parser.add_argument("--import-link", metavar="PATH", help="导入 bangumi-link 的本地仓库或压缩包，用于离线查询关联条目")
+    parser.add_argument("--import-archive", metavar="PATH", help="导入 Bangumi Archive 的条目数据，用于离线搜索动画")
+
+    args = parser.parse_args(argv)
+    if args.resume and args.rollback:
+        parser.error("--resume 与 --rollback 不能同时使用")
+    if not args.folders and not (args.import_link or args.import_archive or args.resume or args.rollback):
+        parser.error("请指定动画文件夹")
+    return args
+
+
+def main(argv=None):
+    args = parseArgs(argv)
+    output = Output(args.json)
+
+    # 导入离线数据
+    if args.import_link:
+        count = importBangumiLink(args.import_link)
+        output.event("imported", f"已导入 bangumi-link 关联数据，共{count}个动画条目", source="link", count=count)
+
+    if args.import_archive:
+        count = importBangumiArchive(args.import_archive)
+        output.event("imported", f"已导入 Bangumi Archive 条目数据，共{count}个动画条目", source="archive", count=count)
+
+    # 跨设备移动时输出复制进度
+    def copyProgress(path, copied, total):
+        output.event("copy", f"正在复制 {path}：{copied * 100 // max(total, 1)}%", path=path, copied=copied, total=total)
+
+    progress = None if args.quiet else copyProgress
+
+    # 处理中断的重命名
+    if args.resume or args.rollback:
+        try:
+            if args.resume:
+                count = Rename.resume(progress=progress, parallelism=args.jobs)
+                output.event("resumed", f"已继续上次的重命名，共{count}个动画", count=count)
+            else:
+                count = Rename.rollback(progress=progress, parallelism=args.jobs)
+                output.event("rolled_back", f"已撤销上次的重命名，共{count}个动画", count=count)
+        except Exception as e:
+            output.event("error", f"重命名失败：{e}", message=str(e))
+            return EXIT_RENAME_FAILED
+
+    if not args.folders:
+        return EXIT_OK
+
+    if args.apply and Rename.pending():
+        message = "存在未完成的重命名，请先使用--resume继续或--rollback撤销"
+        output.event("error", message, message=message)
+        return EXIT_CHECK_FAILED
+
+    path_list = (path for folder in args.folders for path in scanLibrary(os.path.abspath(folder), args.depth))
+    _, anime_list = appendAnimeData(0, [], path_list, checked=True)
+    if not anime_list:
+        output.event("error", "没有可分析的文件夹", message="no folders")
+        return EXIT_CHECK_FAILED
+
+    # 分析
+    analysis = Analysis()
+    if not args.quiet:
+        analysis.anime_state.connect(lambda state: output.event(
+            "state", f"[{state[0] + 1}/{len(anime_list)}] {anime_list[state[0]]['file_name']} {state[1]}",
+            id=state[0], state=state[1]))
+
+    engine = AnalysisEngine(analysis)
+    engine.submitBatch(anime_list)
+    engine.join()
+
+    # 输出重命名结果
+    analysed_list = [anime for anime in anime_list if anime["final_name"]]
+    for anime in anime_list:
+        if anime["final_name"]:
+            text = f"{anime['file_path']} -> {anime['final_path']}"
+        else:
+            text = f"{anime['file_path']} -> 动画获取失败"
+        output.event("result", text, id=anime["id"], ok=bool(anime["final_name"]),
+                     file_path=anime["file_path"], final_path=anime["final_path"], bangumi_id=anime["bangumi_id"],
+                     name_cn=anime["name_cn"], name_jp=anime["name_jp"])
+
+    exit_code = EXIT_OK if len(analysed_list) == len(anime_list) else EXIT_ANALYSIS_FAILED
+
+    # 重命名
+    if args.apply:
+        errors = Rename.check(analysed_list)
+        if errors:
+            for error in errors:
+                output.event("error", error, message=error)
+            return EXIT_CHECK_FAILED
+
+        try:
+            Rename.start(analysed_list, progress=progress, parallelism=args.jobs)
+        except Exception as e:
+            output.event("error", f"重命名失败：{e}", message=str(e))
+            return EXIT_RENAME_FAILED
+
+        output.event("renamed", f"重命名完成，共{len(analysed_list)}个动画", count=len(analysed_list))
+
+    output.event("done", None, total=len(anime_list), analysed=len(analysed_list), exit_code=exit_code)
+    return exit_code
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
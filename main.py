@@ -1,10 +1,12 @@
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 
 from src.core_home import MyHomeWindow
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # 打包后批量解析文件名时需要创建子进程
     app = QApplication(sys.argv)
     window = MyHomeWindow()
     window.show()
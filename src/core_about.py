@@ -6,6 +6,8 @@ from PySide6.QtWidgets import QDialog
 
 from src.gui.aboutwindow import AboutWindow
 
+from src.module.api.client import client
+
 
 class MyAboutWindow(QDialog, AboutWindow):
     def __init__(self):
@@ -31,10 +33,10 @@ class MyAboutWindow(QDialog, AboutWindow):
         """
         for retry in range(3):
             try:
-                if requests.get(url).status_code == 200:
+                if client.get(url, retries=0).status_code == 200:  # 已在此处重试
                     label.setText("Online")
                     return
-            except requests.ConnectionError:
+            except requests.RequestException:
                 pass
             time.sleep(0.1)
         label.setText("Offline")
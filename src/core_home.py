@@ -1,23 +1,25 @@
 import os
-import time
 import arrow
-import threading
 
-from PySide6.QtWidgets import QMainWindow, QTableWidgetItem, QListWidgetItem
-from PySide6.QtCore import Qt, QUrl, QPoint
+from PySide6.QtWidgets import QMainWindow, QListWidgetItem
+from PySide6.QtCore import Qt, QUrl, QPoint, QTimer
 from PySide6.QtGui import QDesktopServices
-from qfluentwidgets import InfoBar, InfoBarPosition, RoundMenu, Action, FluentIcon
+from qfluentwidgets import InfoBar, InfoBarPosition, RoundMenu, Action, FluentIcon, MessageBox
 
 from src.core_about import MyAboutWindow
 from src.core_setting import MySettingWindow
 
 from src.gui.homewindow import HomeWindow
 from src.gui.components.FsNameEditDialog import FsNameEditDialog
+from src.gui.components.UpdateBus import UpdateBus
 
 from src.module.data import createAnimeData
-from src.module.analysis import Analysis, getFinal
-from src.module.config import openFolder, posterFolder, checkConfigVersion
+from src.module.analysis import Analysis, posterPath
+from src.module.template import renameTemplate
+from src.module.config import openFolder, checkConfigVersion
 from src.module.rename import Rename
+from src.module.scanner import PathIndex
+from src.module.engine import AnalysisEngine
 from src.module.version import Version
 from src.module.utils import getResource
 
@@ -30,9 +32,6 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         self.initData()
         self.initContent()
 
-        self.anime_id = 0
-        self.anime_list = []
-
         # 检查版本更新
         self.version = Version()
         self.version.has_update.connect(self.checkVersion)
@@ -41,16 +40,29 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         # 检查配置文件版本
         checkConfigVersion()
 
+        # 检查上次未完成的重命名(窗口显示后再询问)
+        QTimer.singleShot(0, self.checkPendingRename)
+
         # 加载动画分析类
         self.analysis = Analysis()
-        self.analysis.main_state.connect(self.showState)
-        self.analysis.anime_state.connect(self.showStateInTable)
-        self.analysis.added_progress_count.connect(self.increaseProgress)
+
+        # Analysis不依赖Qt，其信号在工作线程中发出，经更新通道合并后按帧刷新到界面
+        self.updateBus = UpdateBus()
+        self.analysis.main_state.connect(self.updateBus.pushMainState)
+        self.analysis.anime_state.connect(self.updateBus.pushState)
+        self.analysis.added_progress_count.connect(self.updateBus.pushProgress)
+        self.analysis.batch_finished.connect(self.updateBus.pushBatchFinished)
+        self.updateBus.main_state.connect(self.showState)
+        self.updateBus.states_changed.connect(self.tableModel.setStates)
+        self.updateBus.rows_finished.connect(self.tableModel.finishRows)
+        self.updateBus.progress_added.connect(self.increaseProgress)
+        self.updateBus.batch_finished.connect(self.finishAnalysis)
+        self.engine = AnalysisEngine(self.analysis)
 
     def initConnect(self):
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)  # 自定义右键菜单
         self.table.customContextMenuRequested.connect(self.showTableMenu)
-        self.table.itemSelectionChanged.connect(self.showAnimeInDetail)  # 点击显示动画信息
+        self.table.selectionModel().selectionChanged.connect(lambda: self.showAnimeInDetail())  # 点击显示动画信息
 
         self.searchList.setContextMenuPolicy(Qt.CustomContextMenu)  # 自定义右键菜单
         self.searchList.customContextMenuRequested.connect(self.showListMenu)
@@ -71,14 +83,15 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         """
         self.anime_id = 0  # 重置动画计数器
         self.anime_list = []  # 清空动画列表
-        self.table.setRowCount(0)  # 重置表格行数
+        self.path_index = PathIndex()  # 清空已添加文件夹的索引
+        self.tableModel.setAnimeList(self.anime_list)  # 重置表格
 
     def initContent(self, clear_table=True):
         """
         初始化UI界面显示的内容
         """
         if clear_table:
-            self.table.setRowCount(0)  # 清空动画列表
+            self.tableModel.clearStates()  # 清空表格中的分析状态
 
         self.progress.setValue(0)  # 清空进度条
         self.searchList.clear()  # 清空搜索列表
@@ -109,14 +122,6 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         """
         self.stateLabel.setText(state)
 
-    def showStateInTable(self, state):
-        """
-        在表格指定列显示当前动画的分析状态
-        :param state: [坐标id, 状态文字]
-        """
-        list_id, anime_state = state
-        self.table.setItem(list_id, 2, QTableWidgetItem(anime_state))
-
     def showProgressBar(self):
         """
         在左下角显示进度条，同时规定了进度条的最大值
@@ -161,8 +166,7 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         应用保存的配置内容并刷新相关信息
         """
         # 刷新所有文件的重命名信息，确保应用了设置中的命名格式
-        for anime in self.anime_list:
-            getFinal(anime)
+        renameTemplate().applyAll(self.anime_list)
 
         self.showToast("success", "", "配置修改成功")
         self.showAnimeInDetail()
@@ -172,9 +176,8 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         获取表格选中行的行号，若选中多行，则只显示第一行
         :return: 选中行的行号
         """
-        for selected in self.table.selectedRanges():
-            row = selected.topRow()
-            return row
+        for index in self.table.selectionModel().selectedIndexes():
+            return index.row()
 
     def cleanTable(self):
         """
@@ -200,24 +203,9 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         :param event: 拖入的文件
         """
         file_list = event.mimeData().urls()
-        anime_data = createAnimeData(self.anime_id, self.anime_list, file_list)
+        anime_data = createAnimeData(self.anime_id, self.anime_list, file_list, self.path_index)
         self.anime_id, self.anime_list = anime_data
-        self.showAnimeInTable()
-
-    def showAnimeInTable(self):
-        """
-        根据anime_list，在表格中展示所有动画条目
-        """
-        self.table.setRowCount(len(self.anime_list))
-
-        for anime in self.anime_list:
-            self.table.setItem(anime["id"], 0, QTableWidgetItem(str(anime["id"] + 1)))
-            self.table.setItem(anime["id"], 1, QTableWidgetItem(anime["file_name"]))
-
-            # 存在final_name确保分析结束
-            if anime["final_name"] != "":
-                self.table.setItem(anime["id"], 2, QTableWidgetItem(anime["name_cn"]))
-                self.table.setItem(anime["id"], 3, QTableWidgetItem(anime["fs_name_cn"]))
+        self.tableModel.syncRows()  # 只插入新增的行
 
     def editBangumiID(self):
         """
@@ -246,21 +234,15 @@ class MyHomeWindow(QMainWindow, HomeWindow):
 
         # 初始化界面
         self.initContent()
-        self.showAnimeInTable()
         self.showProgressBar()
         self.clearButton.setEnabled(False)
         self.analysisButton.setEnabled(False)
         self.renameButton.setEnabled(False)
         self.showState("正在分析中，请稍后")
 
-        # 多线程分析
-        for anime in self.anime_list:
-            thread = threading.Thread(target=self._threadAnalysis, args=(anime,))
-            thread.start()
-
-        # 检测是否结束并隐藏进度条(与多线程分析处于同时进行状态)
-        thread = threading.Thread(target=self._threadFinishCheck)
-        thread.start()
+        # 在分析引擎中并发分析(各阶段分别限制并发数量)
+        self.updateBus.start()
+        self.engine.submitBatch(self.anime_list, callback=self._threadAnalysis)
 
     def startAnalysisByID(self, row, bangumi_id):
         """
@@ -269,42 +251,32 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         :param bangumi_id: 手动指定的bangumi id
         """
         self.analysis.start(self.anime_list[row], bangumi_id)
+        self.updateBus.flush()  # 在主线程中分析，直接发出积累的更新
         self.showState(f"搜索完成：{self.anime_list[row]['name_cn']}")
 
         # 在列表中显示
-        self.showAnimeInTable()
+        self.tableModel.finishRow(row)
         self.showAnimeInDetail()
 
     def _threadAnalysis(self, anime):
         """
-        创建子线程，分析单个动画
-        :param anime: 要分析的动画
+        单个动画分析结束后，在分析引擎的工作线程中调用
+        :param anime: 分析完成的动画
         """
-        # 开始分析
-        self.analysis.start(anime)
+        # 交由更新通道在主线程刷新该行，通过是否存在final_name值检测分析成功
+        self.updateBus.pushFinished(anime["id"])
 
-        # 通过是否存在final_name值检测分析成功
-        if anime["final_name"] == "":
-            self.table.setItem(anime["id"], 3, QTableWidgetItem("==> 动画获取失败（逃"))
-        else:
-            self.showAnimeInTable()
-
-    def _threadFinishCheck(self):
-        """
-        每0.5秒检测一次线程数量，判断是否分析成功
-        """
-        list_count = len(self.anime_list)
-        while True:
-            if threading.active_count() == 2:  # 因为存在主线程 + 检查线程
-                self.progress.setVisible(False)
-                self.clearButton.setEnabled(True)
-                self.analysisButton.setEnabled(True)
-                self.renameButton.setEnabled(True)
-                self.table.selectRow(0)  # 分析完成后自动选中第一行
-                self.showState(f"分析完成，共{list_count}个动画")
-                return
-            else:
-                time.sleep(0.2)
+    def finishAnalysis(self, count):
+        """
+        全部动画分析结束后，隐藏进度条并恢复按钮状态
+        :param count: 本批次分析的动画数量
+        """
+        self.progress.setVisible(False)
+        self.clearButton.setEnabled(True)
+        self.analysisButton.setEnabled(True)
+        self.renameButton.setEnabled(True)
+        self.table.selectRow(0)  # 分析完成后自动选中第一行
+        self.showState(f"分析完成，共{count}个动画")
 
     def showAnimeInDetail(self):
         """
@@ -323,7 +295,7 @@ class MyHomeWindow(QMainWindow, HomeWindow):
             self.scoreLabel.setText(f"当前评分：{anime['score']}")
             self.fileName.setText(f"文件名：{anime['file_name']}")
             self.finalName.setText(f"重命名结果：{anime['final_name'].replace('/', ' / ')}")
-            self.image.updateImage(os.path.join(posterFolder(), os.path.basename(anime["poster"])))
+            self.image.updateImage(posterPath(anime["poster"]) or getResource("src/image/empty.png"))
             self.idLabel.setText(anime["bangumi_id"])
             self.searchList.clear()
             for this in anime["relate"]:
@@ -346,7 +318,7 @@ class MyHomeWindow(QMainWindow, HomeWindow):
     #             else:
     #                 self.anime_list[row]["fs_name_cn"] = new_init_name
     #                 getFinal(self.anime_list[row])
-    #                 self.showAnimeInTable()
+    #                 self.tableModel.finishRow(row)
     #                 self.showAnimeInDetail()
     #
     #     else:
@@ -368,25 +340,46 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         移除动画
         :param row: 要移除的动画所在的行
         """
-        self.anime_list.pop(row)
-
-        # 此行后面的 anime_id 重新排序
-        for i in range(row, len(self.anime_list)):
-            self.anime_list[i]["id"] -= 1
+        anime = self.tableModel.removeAnime(row)  # 同时将此行后面的 anime_id 重新排序
+        self.path_index.remove(anime["file_path"])
 
         self.anime_id -= 1  # 全局 anime_id 减一
-        self.showAnimeInTable()
+
+    def checkPendingRename(self):
+        """
+        若上次重命名中断，询问继续还是撤销
+        """
+        if not Rename.pending():
+            return
+
+        w = MessageBox("上次重命名未完成", "是否继续上次中断的重命名？选择撤销将恢复已重命名的文件夹", self)
+        w.yesButton.setText("继续")
+        w.cancelButton.setText("撤销")
+
+        try:
+            if w.exec():
+                Rename.resume()
+                self.showToast("success", "", "已继续完成上次的重命名")
+            else:
+                Rename.rollback()
+                self.showToast("success", "", "已撤销上次的重命名")
+        except Exception as e:
+            print("checkPendingRename:", e)
+            self.showToast("warning", "", str(e))
 
     def startRename(self):
         """
         重命名函数
         """
         rename = Rename()
-        error = rename.check(self.anime_list)
-
-        # 检查是否满足重命名条件
-        if error:
-            self.showToast("warning", "", error)
+        errors = rename.check(self.anime_list)
+
+        # 检查是否满足重命名条件，一次显示全部冲突
+        if errors:
+            content = "\n".join(errors[:5])
+            if len(errors) > 5:
+                content += f"\n等{len(errors)}个问题"
+            self.showToast("warning", "", content)
             return
 
         # 尝试重命名
@@ -396,10 +389,11 @@ class MyHomeWindow(QMainWindow, HomeWindow):
             self.initContent()
             self.showToast("success", "", "重命名完成")
 
-        # 失败则返回错误信息
+        # 失败则返回错误信息，已完成的部分记录在重命名日志中，可继续或撤销
         except Exception as e:
             print("startRename:", e)
             self.showToast("warning", "", str(e))
+            self.checkPendingRename()
 
     def showTableMenu(self, pos):
         # edit_init_name = Action(FluentIcon.EDIT, "修改首季动画名")
@@ -419,10 +413,10 @@ class MyHomeWindow(QMainWindow, HomeWindow):
         menu.addAction(delete_this_anime)
 
         # 必须选中单元格才会显示
-        if self.table.itemAt(pos) is not None:
+        if self.table.indexAt(pos).isValid():
             # 不使用selectedRowInTable函数，使用当前pos点位计算行数
             # 避免点击右键时，当前行若未选中，会报错
-            row = self.table.row(self.table.itemAt(pos))  # 表格行数
+            row = self.table.indexAt(pos).row()  # 表格行数
 
             # 微调菜单位置并显示菜单
             menu.exec(self.table.mapToGlobal(pos) + QPoint(0, 30), ani=True)
@@ -4,7 +4,7 @@ from qfluentwidgets import Flyout, InfoBarIcon
 
 from src.gui.settingwindow import SettingWindow
 
-from src.module.config import openFolder, posterFolder, logFolder, checkNameFormat, readConfig, writeConfig
+from src.module.config import openFolder, posterFolder, logFolder, checkNameFormat, readConfig, writeConfigs
 
 
 class MySettingWindow(QDialog, SettingWindow):
@@ -51,8 +51,10 @@ class MySettingWindow(QDialog, SettingWindow):
         if error:
             self.showFlyout(error)
         else:
-            writeConfig("Format", "rename_format", self.renameType.currentText())
-            writeConfig("Format", "date_format", self.dateType.currentText())
+            writeConfigs({
+                ("Format", "rename_format"): self.renameType.currentText(),
+                ("Format", "date_format"): self.dateType.currentText()
+            })
             self.config_saved.emit("配置已保存")
             self.close()
 
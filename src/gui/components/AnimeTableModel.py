@@ -0,0 +1,140 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class AnimeTableModel(QAbstractTableModel):
+    headers = ["", "动画文件夹", "动画名", "首季动画名"]
+
+    def __init__(self, anime_list=None):
+        """
+        动画表格的数据模型，直接读取anime_list，只在指定行变化时通知视图刷新
+        :param anime_list: 动画列表
+        """
+        super().__init__()
+        self.anime_list = anime_list if anime_list is not None else []
+        self.states = {}  # 分析中的状态文字 {行号: 状态}
+        self.failed = set()  # 分析失败的行号
+        self._shown = len(self.anime_list)  # 视图中已显示的行数
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.anime_list)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.headers[section]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return
+
+        row, column = index.row(), index.column()
+        anime = self.anime_list[row]
+
+        if column == 0:
+            return str(anime["id"] + 1)
+        elif column == 1:
+            return anime["file_name"]
+
+        # 存在final_name确保分析结束
+        if anime["final_name"] != "":
+            return anime["name_cn"] if column == 2 else anime["fs_name_cn"]
+        elif column == 2:
+            return self.states.get(row)
+        elif row in self.failed:
+            return "==> 动画获取失败（逃"
+
+    def setAnimeList(self, anime_list):
+        """
+        更换动画列表，并清空分析状态
+        :param anime_list: 动画列表
+        """
+        self.beginResetModel()
+        self.anime_list = anime_list
+        self._shown = len(anime_list)
+        self.states.clear()
+        self.failed.clear()
+        self.endResetModel()
+
+    def clearStates(self):
+        """
+        清空所有行的分析状态
+        """
+        if not self.states and not self.failed:
+            return
+        self.states.clear()
+        self.failed.clear()
+        self.refreshRows(0, len(self.anime_list) - 1)
+
+    def syncRows(self):
+        """
+        anime_list末尾追加动画后，通知视图插入新行
+        """
+        count = len(self.anime_list)
+        if count > self._shown:
+            self.beginInsertRows(QModelIndex(), self._shown, count - 1)
+            self._shown = count
+            self.endInsertRows()
+
+    def removeAnime(self, row):
+        """
+        移除动画，并将此行后面的动画ID重新排序
+        :param row: 要移除的动画所在的行
+        :return: 被移除的动画
+        """
+        self.beginRemoveRows(QModelIndex(), row, row)
+        anime = self.anime_list.pop(row)
+        for i in range(row, len(self.anime_list)):
+            self.anime_list[i]["id"] -= 1
+        self.states = {key - (key > row): value for key, value in self.states.items() if key != row}
+        self.failed = {key - (key > row) for key in self.failed if key != row}
+        self._shown = len(self.anime_list)
+        self.endRemoveRows()
+
+        self.refreshRows(row, len(self.anime_list) - 1)  # ID列需要更新
+        return anime
+
+    def setState(self, row, state):
+        """
+        更新指定行的分析状态
+        :param row: 行号
+        :param state: 状态文字
+        """
+        self.setStates({row: state})
+
+    def setStates(self, states):
+        """
+        批量更新多行的分析状态，只发出一次刷新通知
+        :param states: {行号: 状态文字}
+        """
+        self.states.update(states)
+        self.refreshRows(min(states), max(states))
+
+    def finishRows(self, rows):
+        """
+        批量标记多行分析结束，只发出一次刷新通知
+        :param rows: 行号列表
+        """
+        for row in rows:
+            if self.anime_list[row]["final_name"] == "":
+                self.failed.add(row)
+            else:
+                self.failed.discard(row)
+        self.refreshRows(min(rows), max(rows))
+
+    def finishRow(self, row):
+        """
+        指定行分析结束，未生成final_name则标记为失败
+        :param row: 行号
+        """
+        self.finishRows([row])
+
+    def refreshRows(self, first, last):
+        """
+        通知视图刷新指定范围的行
+        :param first: 起始行号
+        :param last: 结束行号
+        """
+        if first <= last:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, self.columnCount() - 1))
@@ -1,38 +1,38 @@
-from PySide6.QtCore import Qt, QRectF
-from PySide6.QtGui import QPixmap, QPainter, QPainterPath
+from PySide6.QtGui import QPainter
 from PySide6.QtWidgets import QLabel
 
+from src.gui.components.ThumbnailCache import thumbnailCache
+
 
 class RoundedImage(QLabel):
     def __init__(self, imagePath):
         super().__init__()
         # TODO: 圆角改成6好一些
         self.radius = 8
+        self.imagePath = None
+        self.thumbnail = None
         self.updateImage(imagePath)
 
     def updateImage(self, imagePath):
-        image = QPixmap(imagePath)
-        width = image.width()
-        height = image.height()
-
-        ratio = height / width
+        self.imagePath = imagePath
+        self.loadThumbnail()
 
-        # 比例在范围内则固定长宽
-        if 1.25 <= ratio <= 1.55:
-            self.setFixedSize(150, 210)
-        else:
-            self.setFixedSize(width * 210 / height, 210)
+    def loadThumbnail(self):
+        """
+        从缓存获取当前设备像素比下的缩略图，并按缩略图尺寸固定控件大小
+        """
+        self.thumbnail = thumbnailCache().get(self.imagePath, self.devicePixelRatioF(), self.radius)
+        if self.thumbnail is None:
+            return
 
-        self.setPixmap(image)
+        self.setFixedSize(self.thumbnail.deviceIndependentSize().toSize())
+        self.update()
 
     def paintEvent(self, e):
-        painter = QPainter(self)
-        painter.setRenderHints(QPainter.Antialiasing)
-
-        pixmap = self.pixmap().scaled(
-            self.size() * self.devicePixelRatioF(), Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        # 移动到其他缩放比例的屏幕后重新获取缩略图
+        if self.thumbnail is not None and self.thumbnail.devicePixelRatio() != self.devicePixelRatioF():
+            self.loadThumbnail()
 
-        path = QPainterPath()
-        path.addRoundedRect(QRectF(self.rect()), self.radius, self.radius)
-        painter.setClipPath(path)
-        painter.drawPixmap(self.rect(), pixmap)
+        if self.thumbnail is not None:
+            painter = QPainter(self)
+            painter.drawPixmap(0, 0, self.thumbnail)
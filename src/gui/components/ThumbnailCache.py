@@ -0,0 +1,108 @@
+import os
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QRectF, QSize
+from PySide6.QtGui import QPixmap, QPainter, QPainterPath
+
+from src.module.config import configPath
+
+
+class ThumbnailCache:
+    def __init__(self, max_items=256):
+        """
+        海报缩略图缓存。缩略图已按显示尺寸与设备像素比缩放并裁切圆角，绘制时直接使用
+        :param max_items: 内存中缓存的缩略图数量
+        """
+        self.max_items = max_items
+        self.folder = os.path.join(configPath(), "thumbnail")
+        os.makedirs(self.folder, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+
+    @staticmethod
+    def displaySize(width, height):
+        """
+        根据图片尺寸计算显示尺寸，比例在范围内则固定长宽
+        :return: QSize
+        """
+        ratio = height / width
+        if 1.25 <= ratio <= 1.55:
+            return QSize(150, 210)
+        return QSize(int(width * 210 / height), 210)
+
+    def get(self, image_path, dpr, radius):
+        """
+        获取缩略图，依次查找内存缓存、磁盘缓存，都不存在时生成
+        :param image_path: 原图路径
+        :param dpr: 设备像素比
+        :param radius: 圆角半径(逻辑像素)
+        :return: 缩略图QPixmap，原图无法读取时返回None
+        """
+        try:
+            mtime = os.stat(image_path).st_mtime_ns
+        except OSError:
+            return
+
+        key = hashlib.md5(f"{image_path}|{mtime}|{dpr}|{radius}".encode("utf-8")).hexdigest()
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        disk_path = os.path.join(self.folder, f"{key}.png")
+        thumbnail = QPixmap(disk_path) if os.path.exists(disk_path) else QPixmap()
+        if thumbnail.isNull():
+            thumbnail = self.create(image_path, dpr, radius)
+            if thumbnail is None:
+                return
+            thumbnail.save(disk_path, "PNG")
+        thumbnail.setDevicePixelRatio(dpr)
+
+        with self._lock:
+            self._memory[key] = thumbnail
+            if len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return thumbnail
+
+    def create(self, image_path, dpr, radius):
+        """
+        将原图缩放到显示尺寸并裁切圆角
+        :return: 缩略图QPixmap，原图无法读取时返回None
+        """
+        image = QPixmap(image_path)
+        if image.isNull():
+            return
+
+        size = self.displaySize(image.width(), image.height()) * dpr
+        scaled = image.scaled(size, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+
+        thumbnail = QPixmap(scaled.size())
+        thumbnail.fill(Qt.transparent)
+
+        painter = QPainter(thumbnail)
+        painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform)
+        path = QPainterPath()
+        path.addRoundedRect(QRectF(thumbnail.rect()), radius * dpr, radius * dpr)
+        painter.setClipPath(path)
+        painter.drawPixmap(0, 0, scaled)
+        painter.end()
+
+        return thumbnail
+
+
+_thumbnail_cache = None
+
+
+def thumbnailCache():
+    """
+    获取共用的缩略图缓存，首次调用时创建
+    :return: ThumbnailCache
+    """
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -0,0 +1,95 @@
+import threading
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class UpdateBus(QObject):
+    states_changed = Signal(dict)  # {行号: 状态文字}
+    rows_finished = Signal(list)  # 分析结束的行号
+    progress_added = Signal(int)
+    main_state = Signal(str)
+    batch_finished = Signal(int)
+
+    def __init__(self, interval=33):
+        """
+        工作线程向界面提交更新的通道。push系列方法可在任意线程调用，更新先在内存中合并，
+        再由主线程的定时器按帧批量发出，界面刷新次数与工作线程数量无关
+        :param interval: 刷新间隔(毫秒)，默认约30Hz
+        """
+        super().__init__()
+        self._lock = threading.Lock()
+        self._reset()
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.flush)
+
+    def _reset(self):
+        self._states = {}
+        self._finished = []
+        self._progress = 0
+        self._main_state = None
+        self._batch_count = None
+
+    def start(self):
+        """
+        开始按帧刷新，需在主线程调用
+        """
+        self.timer.start()
+
+    def pushState(self, state):
+        """
+        :param state: [行号, 状态文字]，同一行只保留最新的状态
+        """
+        row, text = state
+        with self._lock:
+            self._states[row] = text
+
+    def pushFinished(self, row):
+        """
+        :param row: 分析结束的行号
+        """
+        with self._lock:
+            self._finished.append(row)
+
+    def pushProgress(self, count):
+        """
+        :param count: 增加的进度
+        """
+        with self._lock:
+            self._progress += count
+
+    def pushMainState(self, text):
+        """
+        :param text: 左下角的状态文字，只保留最新的状态
+        """
+        with self._lock:
+            self._main_state = text
+
+    def pushBatchFinished(self, count):
+        """
+        :param count: 本批次分析的动画数量
+        """
+        with self._lock:
+            self._batch_count = count
+
+    def flush(self):
+        """
+        在主线程中发出合并后的更新。批次结束的更新发出后停止定时器
+        """
+        with self._lock:
+            states, finished, progress = self._states, self._finished, self._progress
+            main_state, batch_count = self._main_state, self._batch_count
+            self._reset()
+
+        if states:
+            self.states_changed.emit(states)
+        if finished:
+            self.rows_finished.emit(finished)
+        if progress:
+            self.progress_added.emit(progress)
+        if main_state is not None:
+            self.main_state.emit(main_state)
+        if batch_count is not None:
+            self.timer.stop()
+            self.batch_finished.emit(batch_count)
@@ -1,13 +1,14 @@
 from PySide6.QtCore import QMetaObject, QRegularExpression
 from PySide6.QtGui import QFontDatabase, QFont, QIcon, QRegularExpressionValidator
-from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame, QAbstractItemView
-from qfluentwidgets import (setThemeColor, PushButton, ToolButton, TableWidget, PrimaryPushButton, FluentIcon,
+from PySide6.QtWidgets import QWidget, QLabel, QVBoxLayout, QHBoxLayout, QFrame, QAbstractItemView, QHeaderView
+from qfluentwidgets import (setThemeColor, PushButton, ToolButton, TableView, PrimaryPushButton, FluentIcon,
                             ProgressRing, ListWidget, LineEdit, InfoBadge)
 from qfluentwidgets.common.style_sheet import styleSheetManager
 
 from src.module.version import Version
 from src.module.utils import getResource
 from src.gui.components.RoundedImage import RoundedImage
+from src.gui.components.AnimeTableModel import AnimeTableModel
 
 
 class HomeWindow(object):
@@ -60,13 +61,14 @@ class HomeWindow(object):
 
         # 表格区域
 
-        self.table = TableWidget(self)
+        self.tableModel = AnimeTableModel()
+        self.table = TableView(self)
+        self.table.setModel(self.tableModel)
         self.table.verticalHeader().hide()  # 隐藏左侧表头
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # 固定行高，避免大量动画时逐行计算高度
         self.table.horizontalHeader().setHighlightSections(False)  # 选中时表头不加粗
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)  # 单选模式
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)  # 禁止双击编辑
-        self.table.setColumnCount(4)
-        self.table.setHorizontalHeaderLabels(["", "动画文件夹", "动画名", "首季动画名"])
         self.table.setColumnWidth(0, 46)  # 1206
         self.table.setColumnWidth(1, 540)
         self.table.setColumnWidth(2, 320)
@@ -1,26 +1,55 @@
-import os
-import re
-import arrow
-import anitopy
-import requests
-
-from PySide6.QtCore import QObject, Signal
-
-from src.module.api.anilist import anilistSearch
+from src.module.api.anilist import AnilistBatchResolver
 from src.module.api.bangumi import bangumiIDSearch, bangumiSubject
 from src.module.api.bangumi_link import bangumiLink
-from src.module.config import posterFolder, readConfig
+from src.module.event import Signal
+from src.module.parser import filename_parser
+from src.module.poster import posterStore
+from src.module.template import renameTemplate
 from src.module.utils import sanitizeName
 
 
-class Analysis(QObject):
-    main_state = Signal(str)
-    anime_state = Signal(list)
-    added_progress_count = Signal(int)
-
+class Analysis:
     def __init__(self):
-        super().__init__()
+        self.main_state = Signal()  # (str)
+        self.anime_state = Signal()  # ([动画id, 状态文字])
+        self.added_progress_count = Signal()  # (int)
+        self.batch_finished = Signal()  # 分析引擎中一批动画全部结束，参数为该批次的动画数量
+
         self.total_process = 5
+        self.anilist = AnilistBatchResolver()
+
+    def prefetch(self, anime_list):
+        """
+        提前提取罗马名并登记到AniList批量查询中，使分析时可以合并请求
+        :param anime_list: 即将分析的动画列表
+        """
+        # 批量解析尚未提取罗马名的文件名
+        anime_parse = [anime for anime in anime_list if not anime["name_romaji"]]
+        parsed_list = filename_parser.parseBatch([anime["file_name"] for anime in anime_parse])
+        for anime, parsed in zip(anime_parse, parsed_list):
+            anime["name_romaji"] = parsed.get("anime_title", "")
+
+        romaji_names = []
+        for anime in anime_list:
+            if anime["name_romaji"]:
+                romaji_names.append(anime["name_romaji"])
+
+        self.anilist.add(romaji_names)
+
+    def stages(self, manual_id=""):
+        """
+        输出分析动画所需的各个阶段
+        :param manual_id: 手动指定bangumi id，此时跳过前三个阶段
+        :return: [(阶段序号, 阶段名, 状态文字, 阶段函数)]
+        """
+        stages = [
+            (1, "romaji", "提取罗马名", self.stageRomaji),
+            (2, "anilist", "搜索日文名", self.stageAnilist),
+            (3, "bangumi_id", "搜索动画条目", self.stageBangumiID),
+            (4, "subject", "搜索动画信息", self.stageSubject),
+            (5, "link", "搜索关联条目", self.stageLink)
+        ]
+        return stages[3:] if manual_id else stages
 
     def start(self, anime, manual_id=""):
         """
@@ -29,49 +58,71 @@ class Analysis(QObject):
         :param manual_id: 手动指定bangumi id
         :return: 仅在分析失败时return None
         """
-        # 1. 提取罗马名
-        if not manual_id:
-            self.anime_state.emit([anime["id"], f"==> [1/{self.total_process}] 提取罗马名"])
-            name_romaji = getRomaji(anime["file_name"])
+        if manual_id:
+            anime["bangumi_id"] = manual_id
 
-            if name_romaji:
-                anime["name_romaji"] = name_romaji
-                self.added_progress_count.emit(1)
-            else:
-                self.added_progress_count.emit(self.total_process - 1)
+        for number, _, text, stage in self.stages(manual_id):
+            if not self.runStage(anime, number, text, stage):
                 return
 
-        # 2. 使用anilist搜索日文名
-        if not manual_id:
-            self.anime_state.emit([anime["id"], f"==> [2/{self.total_process}] 搜索日文名"])
-            name_jp_anilist = anilistSearch(anime["name_romaji"])
+        # 6. 下载海报
+        downloadPoster(anime["poster"])
 
-            if name_jp_anilist:
-                anime["name_jp_anilist"] = name_jp_anilist
-                self.added_progress_count.emit(1)
-            else:
-                self.added_progress_count.emit(self.total_process - 2)
-                return
+        # 7. 写入重命名(由于在其他位置调用，因此直接在函数内写入内容到anime)
+        getFinal(anime)
 
-        # 3. 搜索bangumi id
-        if not manual_id:
-            self.anime_state.emit([anime["id"], f"==> [3/{self.total_process}] 搜索动画条目"])
-            bangumi_id = bangumiIDSearch(anime["name_jp_anilist"])
+    def runStage(self, anime, number, text, stage):
+        """
+        执行单个分析阶段，并发出状态与进度信号
+        :param anime: 动画信息字典
+        :param number: 阶段序号
+        :param text: 状态文字
+        :param stage: 阶段函数，成功时返回True
+        :return: 阶段是否成功
+        """
+        self.anime_state.emit([anime["id"], f"==> [{number}/{self.total_process}] {text}"])
 
-            if bangumi_id:
-                anime["bangumi_id"] = bangumi_id
-                self.added_progress_count.emit(1)
-            else:
-                self.added_progress_count.emit(self.total_process - 3)
-                return
+        if stage(anime):
+            self.added_progress_count.emit(1)
+            return True
         else:
-            bangumi_id = manual_id
-            anime["bangumi_id"] = bangumi_id
+            self.added_progress_count.emit(self.total_process - number)
+            return False
 
-        # 4. 搜索动画详细信息
-        self.anime_state.emit([anime["id"], f"==> [4/{self.total_process}] 搜索动画信息"])
-        bangumi_subject = bangumiSubject(bangumi_id)
+    def stageRomaji(self, anime):
+        """
+        1. 提取罗马名
+        """
+        name_romaji = anime["name_romaji"] or getRomaji(anime["file_name"])
+        if name_romaji:
+            anime["name_romaji"] = name_romaji
+            return True
 
+    def stageAnilist(self, anime):
+        """
+        2. 使用anilist搜索日文名
+        """
+        name_jp_anilist = self.anilist.resolve(anime["name_romaji"])
+        if name_jp_anilist:
+            anime["name_jp_anilist"] = name_jp_anilist
+            return True
+
+    @staticmethod
+    def stageBangumiID(anime):
+        """
+        3. 搜索bangumi id
+        """
+        bangumi_id = bangumiIDSearch(anime["name_jp_anilist"])
+        if bangumi_id:
+            anime["bangumi_id"] = bangumi_id
+            return True
+
+    @staticmethod
+    def stageSubject(anime):
+        """
+        4. 搜索动画详细信息
+        """
+        bangumi_subject = bangumiSubject(anime["bangumi_id"])
         if bangumi_subject:
             anime["name_jp"] = sanitizeName(bangumi_subject["name_jp"])
             anime["name_cn"] = sanitizeName(bangumi_subject["name_cn"])
@@ -83,31 +134,21 @@ class Analysis(QObject):
             anime["release_week"] = bangumi_subject["release_week"]
             anime["episodes"] = bangumi_subject["episodes"]
             anime["score"] = bangumi_subject["score"]
-            self.added_progress_count.emit(1)
-        else:
-            self.added_progress_count.emit(self.total_process - 4)
-            return
+            return True
 
-        # 5. 搜索关联条目
-        self.anime_state.emit([anime["id"], f"==> [5/{self.total_process}] 搜索关联条目"])
+    @staticmethod
+    def stageLink(anime):
+        """
+        5. 搜索关联条目
+        """
         relate_anime = bangumiLink(anime)
-
         if relate_anime:
             # 搜索首季TV，如果没有则返回第一个项目(如剧场版)
             fs_anime = next((item for item in relate_anime if item["platform"] == "TV"), relate_anime[0])
             anime["fs_id"] = fs_anime["id"]
             anime["fs_name_cn"] = sanitizeName(fs_anime["nameCN"])
             anime["relate"] = relate_anime
-            self.added_progress_count.emit(1)
-        else:
-            self.added_progress_count.emit(self.total_process - 5)
-            return
-
-        # 6. 下载海报
-        downloadPoster(anime["poster"])
-
-        # 7. 写入重命名(由于在其他位置调用，因此直接在函数内写入内容到anime)
-        getFinal(anime)
+            return True
 
 
 def getRomaji(file_name):
@@ -116,56 +157,34 @@ def getRomaji(file_name):
     :param file_name: 完整的文件名
     :return: 动画罗马名，若无法识别则返回None
     """
-    # 忽略文件名中特殊字符
-    pattern_ignored = '|'.join(["BD-BOX", "BD", "DVD", "- TV", "- TV + OAD"])
-    file_name = re.sub(pattern_ignored, '', file_name)
+    return filename_parser.title(file_name)
 
-    # anitopy 识别动画名
-    aniparse_options = {'allowed_delimiters': ' .-+[]'}
-    romaji_name = anitopy.parse(file_name, options=aniparse_options)
 
-    if "anime_title" in romaji_name:
-        return romaji_name["anime_title"]
-    else:
-        return
+def posterPath(poster_url):
+    """
+    输出海报在本地的保存路径
+    :param poster_url: 海报图片地址
+    :return: 海报路径，未下载则返回None
+    """
+    return posterStore().path(poster_url)
 
 
 def downloadPoster(poster_url):
     """
-    下载海报，保存到指定地址
+    下载海报，保存到海报文件夹。海报仅用于展示，下载失败不影响重命名
     :param poster_url: 海报图片地址
+    :return: 海报路径，下载失败则返回None
     """
-    poster_path = os.path.join(posterFolder(), os.path.basename(poster_url))
-
-    # 如果存在这张海报则不下载
-    if os.path.exists(poster_path):
+    try:
+        return posterStore().fetch(poster_url)
+    except Exception as e:
+        print("downloadPoster:", e)
         return
 
-    with open(poster_path, "wb") as file:
-        file.write(requests.get(poster_url).content)
-
 
 def getFinal(anime):
     """
     根据配置文件，导出文件的最终名称，直接将新值写入anime
     :param anime: 动画详情
     """
-    data_format = readConfig("Format", "date_format")
-    rename_format = readConfig("Format", "rename_format")
-
-    # 格式化release日期到字典
-    anime["release"] = arrow.get(anime["release_raw"]).format(data_format)
-    anime["release_end"] = arrow.get(anime["release_end_raw"]).format(data_format)
-
-    # 写入final_name到字典
-    rename_format_final = rename_format.format(**anime)  # 替换为anime字典中对应值
-    final_name = eval(f'f"{rename_format_final}"')
-    anime["final_name"] = final_name
-
-    # 写入final_dir到字典
-    final_dir = os.path.dirname(anime["file_path"])
-    anime["final_dir"] = final_dir
-
-    # 写入final_path到字典
-    final_path = os.path.join(final_dir, os.path.normpath(final_name))  # 保证斜杠分隔符在windows下正确
-    anime["final_path"] = final_path
+    renameTemplate().apply(anime)
@@ -1,5 +1,16 @@
 import re
-import requests
+import json
+import threading
+
+from collections import OrderedDict
+
+from src.module.api.cache import TTL
+from src.module.api.client import client, cacheKey
+
+
+URL = "https://graphql.anilist.co"
+CHUNK_SIZE = 25  # 单次批量查询的动画数量
+RESULT_SIZE = 4096  # AnilistBatchResolver保留的查询结果数量
 
 
 # https://anilist.github.io/ApiV2-GraphQL-Docs
@@ -9,19 +20,158 @@ def anilistSearch(romaji_name):
     :param romaji_name: 动画罗马音文件名
     :return: 动画日文名(已清理)
     """
-    query = "query ($id: String) {Media (search: $id, type: ANIME) {title {native}}}"
-    js = {"query": query, "variables": {"id": romaji_name}}
     headers = {'accept': 'application/json'}
-    url = "https://graphql.anilist.co"
 
     try:
-        result = requests.post(url, json=js, headers=headers).json()
+        result = client.post(URL, json=anilistQuery(romaji_name), headers=headers, cache="anilist").json()
+        return cleanNativeName(result["data"]["Media"]["title"]["native"])
+
+    except Exception as e:
+        print(e)
+        return
+
+
+def anilistBatchSearch(romaji_names):
+    """
+    使用带别名的GraphQL查询，在一次请求中搜索多个动画名。已缓存的动画名不会重复查询
+    :param romaji_names: 动画罗马音文件名列表
+    :return: {罗马音文件名: 动画日文名}，请求失败的动画名不包含在结果中
+    """
+    cache = client.cache()
+    names_jp = {}
+    names_query = []
+
+    # 优先读取与单个查询共用的缓存
+    for romaji_name in dict.fromkeys(romaji_names):
+        entry = cache.get(cacheKey("POST", URL, json_body=anilistQuery(romaji_name)))
+        if entry and entry["fresh"]:
+            names_jp[romaji_name] = parseMedia(json.loads(entry["body"])["data"]["Media"])
+        else:
+            names_query.append(romaji_name)
 
-        name_jp_anilist = result["data"]["Media"]["title"]["native"]
-        name_jp_anilist = re.sub(r'（[^）]*）', '', name_jp_anilist).strip()  # 移除括号内容，例 22/7 （ナナブンノニジュウニ）
+    if not names_query:
+        return names_jp
 
-        return name_jp_anilist
+    variables = {f"t{index}": name for index, name in enumerate(names_query)}
+    query_args = ", ".join(f"${alias}: String" for alias in variables)
+    query_fields = " ".join(f"{alias}: Media (search: ${alias}, type: ANIME) {{title {{native}}}}" for alias in variables)
+    js = {"query": f"query ({query_args}) {{{query_fields}}}", "variables": variables}
+    headers = {'accept': 'application/json'}
 
+    try:
+        # 部分动画未找到时，AniList会返回错误状态码，但data中仍包含其他动画的结果
+        result = client.post(URL, json=js, headers=headers).json()
+        data = result.get("data") or {}
     except Exception as e:
-        print(e)
+        print("anilistBatchSearch:", e)
+        return names_jp
+
+    for alias, romaji_name in variables.items():
+        if alias not in data:
+            continue
+        names_jp[romaji_name] = parseMedia(data[alias])
+
+        # 按单个查询的格式写入缓存。未找到的动画不缓存，与单个查询一致，以便AniList收录后可以查到
+        if not data[alias]:
+            continue
+        body = json.dumps({"data": {"Media": data[alias]}}, ensure_ascii=False).encode("utf-8")
+        cache.put(cacheKey("POST", URL, json_body=anilistQuery(romaji_name)), body, TTL["anilist"],
+                  content_type="application/json; charset=utf-8")
+
+    return names_jp
+
+
+def anilistQuery(romaji_name):
+    """
+    :param romaji_name: 动画罗马音文件名
+    :return: 单个动画名的GraphQL请求内容
+    """
+    query = "query ($id: String) {Media (search: $id, type: ANIME) {title {native}}}"
+    return {"query": query, "variables": {"id": romaji_name}}
+
+
+def parseMedia(media):
+    """
+    :param media: GraphQL返回的Media对象
+    :return: 动画日文名(已清理)，未找到则返回None
+    """
+    if not media or not media["title"]["native"]:
         return
+    return cleanNativeName(media["title"]["native"])
+
+
+def cleanNativeName(name_jp_anilist):
+    """
+    :param name_jp_anilist: AniList中的日文名
+    :return: 移除括号内容后的日文名，例 22/7 （ナナブンノニジュウニ）
+    """
+    return re.sub(r'（[^）]*）', '', name_jp_anilist).strip()
+
+
+class AnilistBatchResolver:
+    def __init__(self, chunk_size=CHUNK_SIZE, result_size=RESULT_SIZE):
+        """
+        批量解析罗马音名。先通过add登记待分析的动画名，
+        任一线程调用resolve时，会将其与其他待解析的动画名合并为一次查询
+        :param chunk_size: 单次批量查询的动画数量
+        :param result_size: 保留的查询结果数量，超出时丢弃最早的结果(之后可从响应缓存中读取)
+        """
+        self.chunk_size = chunk_size
+        self.result_size = result_size
+
+        self._lock = threading.Lock()
+        self._pending = {}  # 等待查询的动画名(作为有序集合使用)
+        self._inflight = {}  # 正在查询的动画名: threading.Event
+        self._results = OrderedDict()
+
+    def add(self, romaji_names):
+        """
+        登记待查询的动画名
+        :param romaji_names: 动画罗马音文件名列表
+        """
+        with self._lock:
+            for romaji_name in romaji_names:
+                if romaji_name not in self._results and romaji_name not in self._inflight:
+                    self._pending[romaji_name] = None
+
+    def resolve(self, romaji_name):
+        """
+        获取动画日文名，必要时与其他待查询的动画名一起批量查询
+        :param romaji_name: 动画罗马音文件名
+        :return: 动画日文名(已清理)
+        """
+        with self._lock:
+            if romaji_name in self._results:
+                return self._results[romaji_name]
+
+            event = self._inflight.get(romaji_name)
+            chunk = None
+            if event is None:
+                self._pending.pop(romaji_name, None)
+                chunk = [romaji_name] + list(self._pending)[:self.chunk_size - 1]
+                event = threading.Event()
+                for name in chunk:
+                    self._pending.pop(name, None)
+                    self._inflight[name] = event
+
+        if chunk:
+            names_jp = {}
+            try:
+                names_jp = anilistBatchSearch(chunk)
+            finally:
+                with self._lock:
+                    self._results.update(names_jp)
+                    while len(self._results) > self.result_size:
+                        self._results.popitem(last=False)
+                    for name in chunk:
+                        self._inflight.pop(name, None)
+                event.set()
+        else:
+            event.wait()
+
+        with self._lock:
+            if romaji_name in self._results:
+                return self._results[romaji_name]
+
+        # 批量查询失败时，单独查询
+        return anilistSearch(romaji_name)
@@ -1,4 +1,5 @@
-import requests
+from src.module.api.client import client
+from src.module.api.subject_store import subject_store
 
 
 # https://bangumi.github.io/api
@@ -8,12 +9,17 @@ def bangumiIDSearch(name_jp):
     :param name_jp: 动画日文名称
     :return: Bangumi ID
     """
+    # 优先查询本地条目数据库
+    bangumi_id = subject_store.search(name_jp)
+    if bangumi_id:
+        return bangumi_id
+
     name_jp = name_jp.replace("!", " ").replace("-", " ").replace("/", " ").strip()  # 搜索时移除特殊符号避免报错
-    headers = {"accept": "application/json", "User-Agent": "nuthx/bangumi-renamer"}
+    headers = {"accept": "application/json"}
     url = "https://api.bgm.tv/search/subject/" + name_jp + "?type=2&responseGroup=large&max_results=25"
 
     try:
-        result = requests.post(url, headers=headers).json()
+        result = client.post(url, headers=headers, cache="search").json()
         bangumi_id = result["list"][0]["id"]
         return str(bangumi_id)
 
@@ -28,11 +34,14 @@ def bangumiSubject(bangumi_id):
     :param bangumi_id: Bangumi ID
     :return: 动画详情字典
     """
-    headers = {"accept": "application/json", "User-Agent": "nuthx/bangumi-renamer"}
+    headers = {"accept": "application/json"}
     url = "https://api.bgm.tv/v0/subjects/" + bangumi_id
 
     try:
-        result = requests.get(url, headers=headers).json()
+        # 优先查询本地条目数据库
+        result = subject_store.get(bangumi_id)
+        if result is None:
+            result = client.get(url, headers=headers, cache="subject").json()
 
         # type
         if result["platform"] in ["TV"]:
@@ -1,4 +1,5 @@
-import requests
+from src.module.api.client import client
+from src.module.api.link_index import link_index
 
 
 # https://github.com/ekibot/bangumi-link
@@ -10,14 +11,17 @@ def bangumiLink(anime):
     """
     bangumi_id = anime["bangumi_id"]
     try:
-        bangumi_ids = str(int(bangumi_id) // 1000)
-        map_id = requests.get(f"https://cdn.jsdelivr.net/gh/ekibot/bangumi-link/node/{bangumi_ids}/{bangumi_id}").text
+        # 优先使用离线索引，未导入或未收录时在线查询
+        nodes = link_index.get(bangumi_id)
+        if nodes is None:
+            bangumi_ids = str(int(bangumi_id) // 1000)
+            map_id = client.get(f"https://cdn.jsdelivr.net/gh/ekibot/bangumi-link/node/{bangumi_ids}/{bangumi_id}", cache="link").text
 
-        map_ids = str(int(map_id) // 1000)
-        result = requests.get(f"https://cdn.jsdelivr.net/gh/ekibot/bangumi-link/map/{map_ids}/{map_id}.json").json()
+            map_ids = str(int(map_id) // 1000)
+            nodes = client.get(f"https://cdn.jsdelivr.net/gh/ekibot/bangumi-link/map/{map_ids}/{map_id}.json", cache="link").json()["node"]
 
         # 清理无用数据
-        result = [item for item in result["node"] if item["type"] == 2]  # 只保留动画，移除小说、游戏等类别
+        result = [item for item in nodes if item["type"] == 2]  # 只保留动画，移除小说、游戏等类别
         result = [item for item in result if item["platform"] != "WEB"]  # 移除web类别
 
         # 没有中文名字的数据，用原始名称代替
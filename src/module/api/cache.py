@@ -0,0 +1,119 @@
+import os
+import time
+import sqlite3
+import threading
+
+from src.module.config import configPath
+
+
+# 各类响应的缓存有效期，单位为秒
+TTL = {
+    "anilist": 30 * 86400,  # AniList 搜索结果
+    "search": 7 * 86400,  # Bangumi 条目搜索结果
+    "subject": 3 * 86400,  # Bangumi 条目详情(评分会变化)
+    "link": 7 * 86400,  # bangumi-link 关联数据
+}
+
+MAX_SIZE = 256 * 1024 * 1024  # 缓存数据库的内容上限，超出后按最近使用时间淘汰
+
+
+class ResponseCache:
+    def __init__(self, path=None, max_size=MAX_SIZE):
+        """
+        基于SQLite的API响应缓存
+        :param path: 缓存数据库路径，默认位于配置文件夹
+        :param max_size: 缓存内容的最大字节数
+        """
+        self.path = path or os.path.join(configPath(), "cache.db")
+        self.max_size = max_size
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS response (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                content_type TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS response_accessed ON response (accessed)")
+        self._db.commit()
+        self._size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM response").fetchone()[0]
+
+    def get(self, key):
+        """
+        读取缓存，同时更新最近使用时间
+        :param key: 缓存键
+        :return: 缓存内容字典，不存在则返回None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, content_type, etag, last_modified, expires FROM response WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return
+
+            self._db.execute("UPDATE response SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+        body, content_type, etag, last_modified, expires = row
+        return {
+            "body": body,
+            "content_type": content_type,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": expires > time.time()
+        }
+
+    def put(self, key, body, ttl, content_type=None, etag=None, last_modified=None):
+        """
+        写入缓存，超出容量时淘汰最久未使用的内容
+        :param key: 缓存键
+        :param body: 响应内容
+        :param ttl: 有效期(秒)
+        :param content_type: 响应的Content-Type
+        :param etag: 响应的ETag
+        :param last_modified: 响应的Last-Modified
+        """
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM response WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO response VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, body, content_type, etag, last_modified, now + ttl, now, len(body))
+            )
+            self._size += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def refresh(self, key, ttl):
+        """
+        服务器确认缓存未变化(304)时，延长缓存有效期
+        :param key: 缓存键
+        :param ttl: 有效期(秒)
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE response SET expires = ?, accessed = ? WHERE key = ?", (now + ttl, now, key))
+            self._db.commit()
+
+    def _evict(self):
+        """
+        按最近使用时间淘汰缓存，直到总大小低于上限的90%
+        """
+        if self._size <= self.max_size:
+            return
+
+        target = self.max_size * 0.9
+        rows = self._db.execute("SELECT key, size FROM response ORDER BY accessed").fetchall()
+        for key, size in rows:
+            if self._size <= target:
+                break
+            self._db.execute("DELETE FROM response WHERE key = ?", (key,))
+            self._size -= size
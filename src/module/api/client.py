@@ -0,0 +1,205 @@
+import json
+import time
+import threading
+import requests
+
+from urllib.parse import urlsplit, urlunsplit
+
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from src.module.api.cache import TTL, ResponseCache
+from src.module.api.ratelimit import MAX_RETRIES, RETRY_STATUS, RateLimiter, backoff
+from src.module.api.singleflight import SingleFlight
+
+
+USER_AGENT = "nuthx/bangumi-renamer"
+TIMEOUT = (5, 30)  # (连接超时, 读取超时)，单位为秒
+
+
+class HttpClient:
+    def __init__(self, pool_size=16, timeout=TIMEOUT, user_agent=USER_AGENT):
+        """
+        所有API模块共用的HTTP客户端，按主机复用长连接
+        :param pool_size: 每个主机的最大连接数
+        :param timeout: 默认超时时间 (连接超时, 读取超时)
+        :param user_agent: 请求头中的User-Agent
+        """
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+        # 连接池由所有线程共享，Session则每个线程各自持有，避免共享cookie等状态
+        self._adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self._local = threading.local()
+        self._cache = None
+        self._cache_lock = threading.Lock()
+        self.limiter = RateLimiter()
+        self.host_overrides = {}  # {主机名: 替换后的地址前缀}，用于在本地服务器上测试
+        self._flight = SingleFlight()
+
+    def overrideHost(self, host, base_url):
+        """
+        将发往指定主机的请求转发到其他地址，路径与参数保持不变。限速与缓存仍按原地址计算
+        :param host: 原主机名，如 api.bgm.tv
+        :param base_url: 替换的地址前缀，如 http://127.0.0.1:8000/bgm，为None时取消转发
+        """
+        if base_url is None:
+            self.host_overrides.pop(host, None)
+        else:
+            self.host_overrides[host] = base_url.rstrip("/")
+
+    def resolveUrl(self, url):
+        """
+        :param url: 请求地址
+        :return: 应用overrideHost后的实际请求地址
+        """
+        parts = urlsplit(url)
+        base_url = self.host_overrides.get(parts.hostname)
+        if base_url is None:
+            return url
+        return base_url + urlunsplit(("", "", parts.path, parts.query, ""))
+
+    def session(self):
+        """
+        获取当前线程的Session，首次调用时创建并挂载共享连接池
+        :return: requests.Session
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            session.headers["User-Agent"] = self.user_agent
+            self._local.session = session
+        return session
+
+    def cache(self):
+        """
+        获取响应缓存，首次调用时打开缓存数据库
+        :return: ResponseCache
+        """
+        with self._cache_lock:
+            if self._cache is None:
+                self._cache = ResponseCache()
+            return self._cache
+
+    def request(self, method, url, cache=None, retries=None, **kwargs):
+        """
+        发送请求，未指定时使用默认超时时间
+        :param method: 请求方法
+        :param url: 请求地址
+        :param cache: 响应类型，对应cache.TTL中的键；指定后优先使用本地缓存，且合并并发的相同请求
+        :param retries: 失败后的最大重试次数，默认仅对限速列表中的API主机重试MAX_RETRIES次
+        :return: requests.Response
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if cache is None:
+            return self._send(method, url, retries, **kwargs)
+
+        key = cacheKey(method, url, kwargs.get("params"), kwargs.get("json"), kwargs.get("data"))
+        return self._flight.do(key, self._cachedRequest, key, method, url, TTL[cache], retries=retries, **kwargs)
+
+    def _cachedRequest(self, key, method, url, ttl, **kwargs):
+        """
+        带缓存的请求。缓存有效时直接返回，过期时使用ETag/Last-Modified向服务器确认
+        :param key: 缓存键
+        :param method: 请求方法
+        :param url: 请求地址
+        :param ttl: 缓存有效期(秒)
+        :return: requests.Response
+        """
+        cache = self.cache()
+        entry = cache.get(key)
+
+        if entry and entry["fresh"]:
+            return cachedResponse(url, entry)
+
+        # 缓存过期，附带验证信息请求
+        headers = dict(kwargs.pop("headers", None) or {})
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = self._send(method, url, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            cache.refresh(key, ttl)
+            return cachedResponse(url, entry)
+
+        if response.status_code == 200:
+            cache.put(key, response.content, ttl,
+                      content_type=response.headers.get("Content-Type"),
+                      etag=response.headers.get("ETag"),
+                      last_modified=response.headers.get("Last-Modified"))
+
+        return response
+
+    def _send(self, method, url, retries=None, **kwargs):
+        """
+        按主机限速发送请求。遇到限流、服务器错误或网络错误时，
+        按Retry-After或带随机抖动的指数退避等待后重试
+        :param method: 请求方法
+        :param url: 请求地址
+        :param retries: 最大重试次数，为None时API主机重试MAX_RETRIES次，其他主机不重试
+        :return: requests.Response
+        """
+        host = urlsplit(url).hostname
+        url = self.resolveUrl(url)
+        if retries is None:
+            retries = MAX_RETRIES if host in self.limiter.rates else 0
+
+        for attempt in range(retries + 1):
+            self.limiter.acquire(host)
+            try:
+                response = self.session().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == retries:
+                    raise
+                time.sleep(backoff(attempt))
+                continue
+
+            wait = self.limiter.update(host, response)
+            if response.status_code not in RETRY_STATUS or attempt == retries:
+                return response
+
+            # 令牌桶已按Retry-After暂停，此处只需等待退避时间
+            if wait is None:
+                time.sleep(backoff(attempt))
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+
+def cacheKey(method, url, params=None, json_body=None, data=None):
+    """
+    根据请求方法、地址与参数生成缓存键
+    :return: 缓存键
+    """
+    key = {"method": method, "url": url, "params": params, "json": json_body, "data": data}
+    return json.dumps(key, sort_keys=True, ensure_ascii=False)
+
+
+def cachedResponse(url, entry):
+    """
+    将缓存内容还原为requests.Response
+    :param url: 请求地址
+    :param entry: 缓存内容字典
+    :return: requests.Response
+    """
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = entry["body"]
+    response.headers = CaseInsensitiveDict()
+    if entry["content_type"]:
+        response.headers["Content-Type"] = entry["content_type"]
+    response.encoding = get_encoding_from_headers(response.headers) or "utf-8"
+    return response
+
+
+client = HttpClient()
@@ -0,0 +1,150 @@
+import os
+import re
+import json
+import mmap
+import shutil
+import struct
+import zipfile
+import tarfile
+import threading
+
+from src.module.config import configPath
+
+
+MAGIC = b"BGLK"
+HEADER = struct.Struct("<4sII")  # 标识, 版本, 条目数量
+RECORD = struct.Struct("<IQI")  # 条目ID, 关联数据偏移, 关联数据长度
+VERSION = 1
+
+MAP_PATTERN = re.compile(r"(^|/)map/\d+/(\d+)\.json$")
+
+
+def linkIndexPath():
+    """
+    :return: bangumi-link 离线索引的路径
+    """
+    return os.path.join(configPath(), "bangumi_link.idx")
+
+
+class LinkIndex:
+    def __init__(self, path=None):
+        """
+        bangumi-link 离线索引。文件由按条目ID排序的定长记录与各关联图的JSON组成，
+        通过mmap映射到内存后二分查找，无需读取整个文件
+        :param path: 索引文件路径，默认位于配置文件夹
+        """
+        self.path = path or linkIndexPath()
+        self._lock = threading.Lock()
+        self._mmap = None
+        self._count = 0
+        self._mtime = None
+
+    def _open(self):
+        """
+        首次查询或索引文件更新后，重新映射索引文件
+        :return: 索引文件存在时返回True
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+        with self._lock:
+            if self._mtime != mtime:
+                with open(self.path, "rb") as file:
+                    data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, count = HEADER.unpack_from(data, 0)
+                if magic != MAGIC or version != VERSION:
+                    data.close()
+                    return False
+                self._mmap, self._count, self._mtime = data, count, mtime
+        return True
+
+    def get(self, subject_id):
+        """
+        查询条目所在关联图中的全部节点
+        :param subject_id: Bangumi ID
+        :return: 节点列表，不存在则返回None
+        """
+        if not self._open():
+            return
+
+        data, count = self._mmap, self._count
+        subject_id = int(subject_id)
+        low, high = 0, count - 1
+        while low <= high:
+            middle = (low + high) // 2
+            record_id, offset, length = RECORD.unpack_from(data, HEADER.size + middle * RECORD.size)
+            if record_id < subject_id:
+                low = middle + 1
+            elif record_id > subject_id:
+                high = middle - 1
+            else:
+                return json.loads(data[offset:offset + length])
+
+
+def iterMaps(source):
+    """
+    读取 bangumi-link 的本地仓库、zip或tar压缩包，逐个输出关联图
+    :param source: 仓库文件夹或压缩包路径
+    :return: 关联图(map/*.json)内容的生成器
+    """
+    if os.path.isdir(source):
+        for folder, _, files in os.walk(os.path.join(source, "map")):
+            for file in files:
+                if file.endswith(".json"):
+                    with open(os.path.join(folder, file), "rb") as content:
+                        yield json.load(content)
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for name in archive.namelist():
+                if MAP_PATTERN.search(name):
+                    yield json.loads(archive.read(name))
+
+    else:
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if member.isfile() and MAP_PATTERN.search(member.name):
+                    yield json.load(archive.extractfile(member))
+
+
+def importBangumiLink(source, path=None):
+    """
+    将 bangumi-link 数据导入为离线索引。只保留动画节点，每个关联图只存储一次
+    :param source: 仓库文件夹或压缩包路径
+    :param path: 索引文件路径，默认位于配置文件夹
+    :return: 导入的动画条目数量
+    """
+    path = path or linkIndexPath()
+    blob_path = path + ".blob"
+    temp_path = path + ".tmp"
+    records = {}
+
+    # 关联图数据先写入临时文件，避免全部保存在内存中
+    with open(blob_path, "wb") as blob_file:
+        offset = 0
+        for link_map in iterMaps(source):
+            nodes = [node for node in link_map.get("node", []) if node.get("type") == 2]
+            if not nodes:
+                continue
+            blob = json.dumps(nodes, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            blob_file.write(blob)
+            for node in nodes:
+                records.setdefault(int(node["id"]), (offset, len(blob)))
+            offset += len(blob)
+
+    data_start = HEADER.size + len(records) * RECORD.size
+    with open(temp_path, "wb") as file, open(blob_path, "rb") as blob_file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for subject_id in sorted(records):
+            blob_offset, length = records[subject_id]
+            file.write(RECORD.pack(subject_id, data_start + blob_offset, length))
+        shutil.copyfileobj(blob_file, file)
+
+    os.remove(blob_path)
+    os.replace(temp_path, path)
+    return len(records)
+
+
+link_index = LinkIndex()
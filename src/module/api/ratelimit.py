@@ -0,0 +1,151 @@
+import time
+import random
+import threading
+
+from email.utils import parsedate_to_datetime
+
+
+# 各主机的请求速率(每秒请求数, 突发容量)，未列出的主机不限速
+RATES = {
+    "graphql.anilist.co": (1.5, 5),  # 官方限制为每分钟90次
+    "api.bgm.tv": (5, 10),
+    "cdn.jsdelivr.net": (20, 40),
+}
+
+MAX_RETRIES = 4  # 请求失败后的最大重试次数
+BACKOFF_BASE = 1  # 指数退避的初始等待时间(秒)
+BACKOFF_CAP = 60  # 单次等待时间的上限(秒)
+RETRY_STATUS = {429, 500, 502, 503, 504}  # 需要重试的状态码
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """
+        令牌桶，按固定速率补充令牌。触发限流时速率减半，之后随成功请求逐渐恢复
+        :param rate: 每秒补充的令牌数量
+        :param capacity: 令牌桶容量
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0
+
+    def acquire(self):
+        """
+        获取一个令牌，令牌不足或处于暂停状态时阻塞等待
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if now < self._blocked_until:
+                    wait = self._blocked_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                else:
+                    wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+    def block(self, seconds):
+        """
+        暂停发放令牌
+        :param seconds: 暂停的秒数
+        """
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+    def slowDown(self):
+        """
+        触发限流后速率减半
+        """
+        with self._lock:
+            self.rate = max(self.max_rate / 16, self.rate / 2)
+
+    def speedUp(self):
+        """
+        请求成功后逐渐恢复速率
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class RateLimiter:
+    def __init__(self, rates=None):
+        """
+        按主机限速的限流器，由所有API模块共用
+        :param rates: 各主机的请求速率，默认为RATES，为空字典时不限速
+        """
+        self.rates = RATES if rates is None else rates
+        self._buckets = {host: TokenBucket(*rate) for host, rate in self.rates.items()}
+
+    def acquire(self, host):
+        """
+        发送请求前调用，按主机限速
+        :param host: 请求的主机名
+        """
+        bucket = self._buckets.get(host)
+        if bucket:
+            bucket.acquire()
+
+    def update(self, host, response):
+        """
+        根据响应头中的Retry-After与X-RateLimit-*调整限速
+        :param host: 请求的主机名
+        :param response: requests.Response
+        :return: 服务器要求的等待时间(秒)，无要求则返回None
+        """
+        bucket = self._buckets.get(host)
+        wait = retryAfter(response)
+
+        # 剩余次数耗尽时，暂停到重置时间
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if wait is None and remaining == "0" and reset and reset.isdigit():
+            wait = max(0, int(reset) - time.time())
+
+        if bucket:
+            if response.status_code == 429:
+                bucket.slowDown()
+            elif response.status_code < 400:
+                bucket.speedUp()
+            if wait:
+                bucket.block(wait)
+
+        return wait
+
+
+def retryAfter(response):
+    """
+    解析Retry-After响应头，支持秒数与HTTP日期两种格式
+    :param response: requests.Response
+    :return: 等待时间(秒)，不存在则返回None
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return
+
+    if value.isdigit():
+        return int(value)
+
+    try:
+        return max(0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return
+
+
+def backoff(attempt):
+    """
+    带随机抖动的指数退避时间
+    :param attempt: 第几次重试(从0开始)
+    :return: 等待时间(秒)
+    """
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
@@ -0,0 +1,40 @@
+import threading
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        合并并发的相同请求：同一时间内相同键的调用只执行一次，其余调用等待并共享结果
+        """
+        self._lock = threading.Lock()
+        self._calls = {}  # 键: [threading.Event, 结果, 异常]
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        执行函数，若相同键的调用正在进行则等待其结果
+        :param key: 调用的键
+        :param func: 要执行的函数
+        :return: 函数返回值，函数抛出的异常会传递给所有等待者
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = [threading.Event(), None, None]
+                self._calls[key] = call
+
+        if not leader:
+            call[0].wait()
+        else:
+            try:
+                call[1] = func(*args, **kwargs)
+            except Exception as e:
+                call[2] = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call[0].set()
+
+        if call[2] is not None:
+            raise call[2]
+        return call[1]
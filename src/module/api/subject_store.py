@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import sqlite3
+import zipfile
+import threading
+import unicodedata
+
+from src.module.config import configPath
+
+
+# Bangumi Archive 中动画条目的平台代码
+PLATFORM = {1: "TV", 2: "OVA", 3: "剧场版", 5: "WEB"}
+
+INFOBOX_ITEM = re.compile(r"^\|\s*([^=]+?)\s*=\s*(.*)$")
+INFOBOX_LIST_ITEM = re.compile(r"^\[(?:([^|\]]*)\|)?(.*)\]$")
+
+
+def subjectStorePath():
+    """
+    :return: 本地条目数据库的路径
+    """
+    return os.path.join(configPath(), "subject.db")
+
+
+def nameKey(name):
+    """
+    统一名称格式，用于名称索引。与bangumiIDSearch中的处理一致，并忽略全半角、大小写与多余空格
+    :param name: 动画名称
+    :return: 索引用的名称
+    """
+    name = unicodedata.normalize("NFKC", name)
+    name = name.replace("!", " ").replace("-", " ").replace("/", " ")
+    return " ".join(name.split()).casefold()
+
+
+def parseInfobox(wiki):
+    """
+    将 Archive 中 wiki 格式的 infobox 转换为与 API 相同的格式
+    :param wiki: wiki 格式的 infobox
+    :return: [{"key": 键, "value": 值}]，多个值的项目为 [{"k": 键, "v": 值}]
+    """
+    infobox = []
+    values = None
+    for line in wiki.splitlines():
+        line = line.strip()
+
+        if values is not None:
+            if line == "}":
+                values = None
+            elif INFOBOX_LIST_ITEM.match(line):
+                key, value = INFOBOX_LIST_ITEM.match(line).groups()
+                values.append({"k": key, "v": value} if key else {"v": value})
+            continue
+
+        match = INFOBOX_ITEM.match(line)
+        if match:
+            key, value = match.groups()
+            if value == "{":
+                values = []
+                infobox.append({"key": key, "value": values})
+            else:
+                infobox.append({"key": key, "value": value.strip()})
+
+    return infobox
+
+
+class SubjectStore:
+    def __init__(self, path=None):
+        """
+        基于 Bangumi Archive 的本地条目数据库，仅包含动画条目
+        :param path: 数据库路径，默认位于配置文件夹
+        """
+        self.path = path or subjectStorePath()
+        self._lock = threading.Lock()
+        self._db = None
+        self._mtime = None
+
+    def _open(self):
+        """
+        首次查询或数据库更新后，重新打开数据库
+        :return: 数据库存在时返回True
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+
+        if self._mtime != mtime:
+            if self._db:
+                self._db.close()
+            self._db = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._mtime = mtime
+        return True
+
+    def search(self, name):
+        """
+        按名称查询条目，优先匹配日文原名，其次为中文名与别名
+        :param name: 动画名称
+        :return: Bangumi ID，未找到则返回None
+        """
+        with self._lock:
+            if not self._open():
+                return
+            row = self._db.execute(
+                "SELECT id FROM subject_name WHERE name = ? ORDER BY priority, id LIMIT 1", (nameKey(name),)
+            ).fetchone()
+
+        if row:
+            return str(row[0])
+
+    def get(self, bangumi_id):
+        """
+        查询条目详情
+        :param bangumi_id: Bangumi ID
+        :return: 与 API /v0/subjects 格式相同的字典，未找到则返回None
+        """
+        with self._lock:
+            if not self._open():
+                return
+            row = self._db.execute(
+                "SELECT id, name, name_cn, platform, date, eps, score, infobox FROM subject WHERE id = ?",
+                (int(bangumi_id),)
+            ).fetchone()
+
+        if row is None:
+            return
+
+        subject_id, name, name_cn, platform, date, eps, score, infobox = row
+        return {
+            "id": subject_id,
+            "name": name,
+            "name_cn": name_cn,
+            "platform": platform,
+            "date": date,
+            "eps": eps,
+            "rating": {"score": score},
+            "infobox": json.loads(infobox),
+            "images": {"medium": f"https://api.bgm.tv/v0/subjects/{subject_id}/image?type=medium"}
+        }
+
+
+def iterSubjects(source):
+    """
+    逐行读取 Bangumi Archive 的条目数据，只输出动画条目
+    :param source: subject.jsonlines 文件，或包含该文件的 Archive 压缩包
+    :return: 条目字典的生成器
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            with archive.open("subject.jsonlines") as file:
+                yield from (subject for subject in map(json.loads, file) if subject["type"] == 2)
+    else:
+        with open(source, "rb") as file:
+            yield from (subject for subject in map(json.loads, file) if subject["type"] == 2)
+
+
+def importBangumiArchive(source, path=None, chunk_size=1000):
+    """
+    将 Bangumi Archive 的条目数据导入本地数据库，完成后整体替换旧数据库
+    :param source: subject.jsonlines 文件，或包含该文件的 Archive 压缩包
+    :param path: 数据库路径，默认位于配置文件夹
+    :param chunk_size: 每次批量写入的条目数量
+    :return: 导入的动画条目数量
+    """
+    path = path or subjectStorePath()
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+    db = sqlite3.connect(temp_path)
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    db.execute("""
+        CREATE TABLE subject (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            name_cn TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            date TEXT,
+            eps INTEGER NOT NULL,
+            score REAL NOT NULL,
+            infobox TEXT NOT NULL
+        )
+    """)
+    db.execute("CREATE TABLE subject_name (name TEXT NOT NULL, priority INTEGER NOT NULL, id INTEGER NOT NULL)")
+
+    count = 0
+    subjects, names = [], []
+    for subject in iterSubjects(source):
+        infobox = parseInfobox(subject.get("infobox") or "")
+        eps = next((item["value"] for item in infobox if item["key"] == "话数"), "")
+        subjects.append((
+            subject["id"],
+            subject["name"],
+            subject["name_cn"],
+            PLATFORM.get(subject.get("platform"), "其他"),
+            subject.get("date") or None,
+            int(eps) if isinstance(eps, str) and eps.isdigit() else 0,
+            subject.get("score") or 0,
+            json.dumps(infobox, ensure_ascii=False)
+        ))
+
+        # 名称索引：日文原名 > 中文名 > 别名
+        aliases = next((item["value"] for item in infobox if item["key"] == "别名"), [])
+        aliases = [alias["v"] for alias in aliases] if isinstance(aliases, list) else [aliases]
+        for priority, name in [(0, subject["name"]), (1, subject["name_cn"])] + [(2, alias) for alias in aliases]:
+            if name:
+                names.append((nameKey(name), priority, subject["id"]))
+
+        count += 1
+        if len(subjects) >= chunk_size:
+            db.executemany("INSERT OR REPLACE INTO subject VALUES (?, ?, ?, ?, ?, ?, ?, ?)", subjects)
+            db.executemany("INSERT INTO subject_name VALUES (?, ?, ?)", names)
+            subjects, names = [], []
+
+    db.executemany("INSERT OR REPLACE INTO subject VALUES (?, ?, ?, ?, ?, ?, ?, ?)", subjects)
+    db.executemany("INSERT INTO subject_name VALUES (?, ?, ?)", names)
+
+    # 导入完成后再建立索引，速度更快
+    db.execute("CREATE INDEX subject_name_name ON subject_name (name, priority, id)")
+    db.commit()
+    db.close()
+
+    os.replace(temp_path, path)
+    return count
+
+
+subject_store = SubjectStore()
@@ -1,9 +1,13 @@
 import os
 import re
+import time
 import platform
+import threading
 import subprocess
 import configparser
 
+from src.module.event import Signal
+
 
 def openFolder(path):
     """
@@ -18,11 +22,25 @@ def openFolder(path):
         subprocess.call(["xdg-open", path])
 
 
+_config_path = None
+
+
 def configPath():
     """
-    输出当前系统下配置文件夹的路径
+    输出当前系统下配置文件夹的路径，仅在首次调用时检查并创建文件夹。
+    设置环境变量 BANGUMI_RENAMER_CONFIG 时使用该文件夹(如基准测试)
     :return: 配置文件夹的路径
     """
+    global _config_path
+    if _config_path is not None:
+        return _config_path
+
+    if os.environ.get("BANGUMI_RENAMER_CONFIG"):
+        config_path = os.environ["BANGUMI_RENAMER_CONFIG"]
+        os.makedirs(config_path, exist_ok=True)
+        _config_path = config_path
+        return config_path
+
     if platform.system() == "Windows":
         sys_path = os.environ["APPDATA"]
     elif platform.system() == "Darwin":
@@ -36,6 +54,7 @@ def configPath():
     if not os.path.exists(config_path):
         os.makedirs(config_path)
 
+    _config_path = config_path
     return config_path
 
 
@@ -75,6 +94,109 @@ def logFolder():
     return log_folder
 
 
+def journalFolder():
+    """
+    输出重命名日志文件夹的路径
+    :return: 重命名日志文件夹的路径
+    """
+    journal_folder = os.path.join(configPath(), "journal")
+    if not os.path.exists(journal_folder):
+        os.makedirs(journal_folder)
+
+    return journal_folder
+
+
+class ConfigStore:
+    def __init__(self, check_interval=1):
+        """
+        进程内共享的配置，读取时使用内存中的内容，配置文件被外部修改时自动重新加载
+        :param check_interval: 检查配置文件修改时间的最小间隔(秒)
+        """
+        self.check_interval = check_interval
+        self.changed = Signal()  # 配置修改或重新加载后发出，参数为修改的 [(配置类别, 配置项目)]，重新加载时为None
+
+        self._lock = threading.RLock()
+        self._config = None
+        self._mtime = None
+        self._checked = 0
+
+    def _refresh(self):
+        """
+        配置文件的修改时间变化时重新加载
+        :return: 是否重新加载
+        """
+        now = time.monotonic()
+        if self._config is not None and now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+
+        config_file = configFile()
+        mtime = os.stat(config_file).st_mtime_ns
+        if self._config is not None and mtime == self._mtime:
+            return False
+
+        config = configparser.ConfigParser()
+        config.read(config_file, encoding="utf-8")
+        reloaded = self._config is not None
+        self._config, self._mtime = config, mtime
+        return reloaded
+
+    def reload(self):
+        """
+        强制重新加载配置文件
+        """
+        with self._lock:
+            self._config = None
+            self._refresh()
+        self.changed.emit(None)
+
+    def check(self):
+        """
+        检查配置文件是否被外部修改，若已修改则重新加载并发出changed
+        """
+        with self._lock:
+            reloaded = self._refresh()
+
+        if reloaded:
+            self.changed.emit(None)
+
+    def get(self, category, item):
+        """
+        读取配置项的值
+        :param category: 配置类别
+        :param item: 配置项目
+        :return: 指定配置项的值
+        """
+        self.check()
+        with self._lock:
+            return self._config.get(category, item)
+
+    def update(self, values):
+        """
+        批量写入配置项，一次性原子地写入配置文件
+        :param values: {(配置类别, 配置项目): 待写入的值}
+        """
+        with self._lock:
+            self._refresh()
+            for (category, item), value in values.items():
+                if not self._config.has_section(category):
+                    self._config.add_section(category)
+                self._config.set(category, item, value)
+
+            # 先写入临时文件再替换，避免写入中断导致配置文件损坏
+            config_file = configFile()
+            temp_file = config_file + ".tmp"
+            with open(temp_file, "w", encoding="utf-8") as content:
+                self._config.write(content)
+            os.replace(temp_file, config_file)
+            self._mtime = os.stat(config_file).st_mtime_ns
+
+        self.changed.emit(list(values))
+
+
+config_store = ConfigStore()
+
+
 def readConfig(category, item):
     """
     读取配置项的值
@@ -82,9 +204,7 @@ def readConfig(category, item):
     :param item: 配置项目
     :return: 指定配置项的值
     """
-    config = configparser.ConfigParser()
-    config.read(configFile())
-    return config.get(category, item)
+    return config_store.get(category, item)
 
 
 def writeConfig(category, item, value):
@@ -94,11 +214,15 @@ def writeConfig(category, item, value):
     :param item: 配置项目
     :param value: 待写入的值
     """
-    config = configparser.ConfigParser()
-    config.read(configFile())
-    config.set(category, item, value)
-    with open(configFile(), "w", encoding="utf-8") as content:
-        config.write(content)
+    config_store.update({(category, item): value})
+
+
+def writeConfigs(values):
+    """
+    批量写入配置项的值
+    :param values: {(配置类别, 配置项目): 待写入的值}
+    """
+    config_store.update(values)
 
 
 def initConfig(config_file):
@@ -141,3 +265,4 @@ def checkConfigVersion():
     if readConfig("Application", "version") != "2.1":
         os.remove(configFile())
         initConfig(configFile())
+        config_store.reload()
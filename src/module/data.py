@@ -1,12 +1,138 @@
 import os
+import sys
 import platform
+import threading
 
+from src.module.scanner import PathIndex
 
-def createAnimeData(anime_id, anime_list, file_list):
-    for file in file_list:
-        # 转换为文件路径
-        file_path = file.toLocalFile()
 
+FIELDS = (
+    "id",  # ID
+    "file_name",  # 原始文件名
+    "file_path",  # 原始文件路径
+    "final_name",  # 重命名后的文件名
+    "final_dir",  # 重命名后的文件目录
+    "final_path",  # 重命名后的文件路径
+    "bangumi_id",  # Bangumi ID
+    "name_jp",  # 日文名称(Bangumi)
+    "name_jp_anilist",  # 日文名称(AniList)
+    "name_romaji",  # 罗马音名称
+    "name_cn",  # 中文名称
+    "poster",  # 海报图片
+    "type",  # 放送类型
+    "typecode",  # 放送类型代码(01: TV版, 02: 剧场版, 03: OVA与OAD, XBD: 其他)
+    "release",  # 放送开始日期
+    "release_raw",  # 放送开始日期(原始)
+    "release_end",  # 放送结束日期
+    "release_end_raw",  # 放送结束日期(原始)
+    "release_week",  # 放送星期
+    "episodes",  # 章节数量
+    "score",  # 当前评分
+    "fs_id",  # 首季度Bangumi ID
+    "fs_name_cn",  # 首季度中文名称动画
+    "relate",  # 关联动画信息
+)
+FIELD_SET = frozenset(FIELDS)
+INTERNED_FIELDS = frozenset(["type", "typecode", "release_week"])  # 取值有限，重复出现的字段
+
+_relate_pool = {}
+_relate_pool_lock = threading.Lock()
+
+
+def shareRelate(relate):
+    """
+    同一关联图中的动画共用一份关联信息
+    :param relate: 关联动画信息列表
+    :return: 共用的关联动画信息(tuple)
+    """
+    key = tuple(item["id"] for item in relate)
+    with _relate_pool_lock:
+        return _relate_pool.setdefault(key, tuple(relate))
+
+
+class AnimeRecord:
+    __slots__ = FIELDS
+
+    def __init__(self, anime_id, file_path):
+        """
+        单个动画的数据。使用__slots__存储，大量文件夹时比字典节省内存。
+        支持与字典相同的下标访问，可直接用于format(**anime)与dict(anime)
+        :param anime_id: 动画ID
+        :param file_path: 原始文件路径
+        """
+        for field in FIELDS:
+            setattr(self, field, "")
+        self.id = anime_id
+        self.file_name = os.path.basename(file_path)
+        self.file_path = file_path
+        self.relate = ()
+
+    def __getitem__(self, key):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        if key in INTERNED_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        elif key == "relate":
+            value = shareRelate(value)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in FIELD_SET
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return f"AnimeRecord({dict(self)!r})"
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in FIELD_SET else default
+
+    def keys(self):
+        return FIELDS
+
+    def values(self):
+        return [getattr(self, field) for field in FIELDS]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in FIELDS]
+
+
+def createAnimeData(anime_id, anime_list, file_list, path_index=None):
+    """
+    将拖入的文件转换为动画数据，追加到动画列表
+    :param anime_id: 下一个动画的ID
+    :param anime_list: 动画列表
+    :param file_list: 拖入的文件(QUrl)列表
+    :param path_index: 已添加文件夹的PathIndex，为None时根据anime_list创建
+    :return: (下一个动画的ID, 动画列表)
+    """
+    path_list = (file.toLocalFile() for file in file_list)  # 转换为文件路径
+    return appendAnimeData(anime_id, anime_list, path_list, path_index)
+
+
+def appendAnimeData(anime_id, anime_list, path_list, path_index=None, checked=False):
+    """
+    将文件夹路径转换为动画数据，追加到动画列表
+    :param anime_id: 下一个动画的ID
+    :param anime_list: 动画列表
+    :param path_list: 文件夹路径的可迭代对象，可以是scanLibrary的生成器
+    :param path_index: 已添加文件夹的PathIndex，为None时根据anime_list创建
+    :param checked: 路径已确认为文件夹时(如scanLibrary的结果)，跳过文件夹检查
+    :return: (下一个动画的ID, 动画列表)
+    """
+    if path_index is None:
+        path_index = PathIndex(item["file_path"] for item in anime_list)
+
+    for file_path in path_list:
         # Windows 下调整路径分隔符
         if platform.system() == "Windows":
             file_path = file_path.replace("/", "\\")
@@ -16,42 +142,14 @@ def createAnimeData(anime_id, anime_list, file_list):
             file_path = file_path[:-1]
 
         # 过滤非文件夹
-        if not os.path.isdir(file_path):
+        if not checked and not os.path.isdir(file_path):
             continue
 
         # 去重已存在的文件夹
-        path_exist = any(item["file_path"] == file_path for item in anime_list)
-        if path_exist:
+        if not path_index.add(file_path):
             continue
 
-        this_anime_dict = {
-            "id": anime_id,  # ID
-            "file_name": os.path.basename(file_path),  # 原始文件名
-            "file_path": file_path,  # 原始文件路径
-            "final_name": "",  # 重命名后的文件名
-            "final_dir": "",  # 重命名后的文件目录
-            "final_path": "",  # 重命名后的文件路径
-            "bangumi_id": "",  # Bangumi ID
-            "name_jp": "",  # 日文名称(Bangumi)
-            "name_jp_anilist": "",  # 日文名称(AniList)
-            "name_romaji": "",  # 罗马音名称
-            "name_cn": "",  # 中文名称
-            "poster": "",  # 海报图片
-            "type": "",  # 放送类型
-            "typecode": "",  # 放送类型代码(01: TV版, 02: 剧场版, 03: OVA与OAD, XBD: 其他)
-            "release": "",  # 放送开始日期
-            "release_raw": "",  # 放送开始日期(原始)
-            "release_end": "",  # 放送结束日期
-            "release_end_raw": "",  # 放送结束日期(原始)
-            "release_week": "",  # 放送星期
-            "episodes": "",  # 章节数量
-            "score": "",  # 当前评分
-            "fs_id": "",  # 首季度Bangumi ID
-            "fs_name_cn": "",  # 首季度中文名称动画
-            "relate": []  # 关联动画信息
-        }
-
-        anime_list.append(this_anime_dict)
+        anime_list.append(AnimeRecord(anime_id, file_path))
         anime_id += 1
 
     return anime_id, anime_list
@@ -0,0 +1,189 @@
+import asyncio
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from src.module.analysis import downloadPoster, getFinal
+
+
+# 各阶段同时执行的最大数量
+STAGE_LIMITS = {
+    "romaji": 4,
+    "anilist": 4,
+    "bangumi_id": 8,
+    "subject": 8,
+    "link": 8,
+    "poster": 8,
+    "final": 4
+}
+
+
+class AnalysisEngine:
+    def __init__(self, analysis, stage_limits=None):
+        """
+        基于asyncio的动画分析引擎，所有动画在同一个事件循环中以协程运行，
+        每个阶段单独限制并发数量
+        :param analysis: Analysis 实例
+        :param stage_limits: 各阶段的最大并发数量，默认为STAGE_LIMITS
+        """
+        self.analysis = analysis
+        self.stage_limits = {**STAGE_LIMITS, **(stage_limits or {})}
+
+        # 阻塞的网络请求在线程池中执行，线程数量为各阶段并发数量之和
+        self._executor = ThreadPoolExecutor(max_workers=sum(self.stage_limits.values()))
+        self._loop = asyncio.new_event_loop()
+        self._limits = {}
+        self._thread = threading.Thread(target=self._threadLoop, daemon=True)
+        self._thread.start()
+
+        self._lock = threading.Lock()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._batch_count = 0
+
+    @property
+    def queued(self):
+        """
+        :return: 等待分析的动画数量
+        """
+        with self._lock:
+            return self._pending - self._running
+
+    @property
+    def running(self):
+        """
+        :return: 正在分析的动画数量
+        """
+        with self._lock:
+            return self._running
+
+    @property
+    def completed(self):
+        """
+        :return: 已完成分析的动画数量
+        """
+        with self._lock:
+            return self._completed
+
+    def isIdle(self):
+        """
+        :return: 没有等待或正在分析的动画时返回True
+        """
+        return self._idle.is_set()
+
+    def submit(self, anime, manual_id="", callback=None):
+        """
+        将动画加入分析
+        :param anime: 动画信息字典
+        :param manual_id: 手动指定bangumi id
+        :param callback: 分析结束后调用，参数为动画信息字典
+        """
+        self.submitBatch([anime], manual_id, callback)
+
+    def submitBatch(self, anime_list, manual_id="", callback=None):
+        """
+        将多个动画加入分析
+        :param anime_list: 动画列表
+        :param manual_id: 手动指定bangumi id
+        :param callback: 每个动画分析结束后调用，参数为动画信息字典
+        """
+        if not anime_list:
+            return
+
+        with self._lock:
+            self._pending += len(anime_list)
+            self._idle.clear()
+
+        asyncio.run_coroutine_threadsafe(self._analyseBatch(list(anime_list), manual_id, callback), self._loop)
+
+    def join(self):
+        """
+        阻塞直到所有动画分析完成，供非GUI场景调用
+        """
+        self._idle.wait()
+
+    def _threadLoop(self):
+        """
+        运行事件循环的子线程
+        """
+        asyncio.set_event_loop(self._loop)
+        self._limits = {name: asyncio.Semaphore(limit) for name, limit in self.stage_limits.items()}
+        self._loop.run_forever()
+
+    async def _runInExecutor(self, name, func, *args):
+        """
+        在指定阶段的并发限制下，于线程池中执行阻塞函数
+        :param name: 阶段名
+        :param func: 阻塞函数
+        :return: 函数返回值
+        """
+        async with self._limits[name]:
+            return await self._loop.run_in_executor(self._executor, func, *args)
+
+    async def _analyseBatch(self, anime_list, manual_id, callback):
+        """
+        分析一批动画的协程。先在线程池中解析整批文件名，避免大批量解析阻塞调用方(GUI)线程
+        :param anime_list: 动画列表
+        :param manual_id: 手动指定bangumi id
+        :param callback: 每个动画分析结束后调用
+        """
+        # 登记整批动画的罗马名，使AniList查询可以合并
+        if not manual_id:
+            try:
+                await self._loop.run_in_executor(self._executor, self.analysis.prefetch, anime_list)
+            except Exception as e:
+                print("AnalysisEngine:", e)
+
+        await asyncio.gather(*(self._analyse(anime, manual_id, callback) for anime in anime_list))
+
+    async def _analyse(self, anime, manual_id, callback):
+        """
+        分析单个动画的协程，流程与Analysis.start一致
+        :param anime: 动画信息字典
+        :param manual_id: 手动指定bangumi id
+        :param callback: 分析结束后调用
+        """
+        with self._lock:
+            self._running += 1
+
+        try:
+            if manual_id:
+                anime["bangumi_id"] = manual_id
+
+            for number, name, text, stage in self.analysis.stages(manual_id):
+                if not await self._runInExecutor(name, self.analysis.runStage, anime, number, text, stage):
+                    break
+            else:
+                await self._runInExecutor("poster", downloadPoster, anime["poster"])
+                await self._runInExecutor("final", getFinal, anime)
+        except Exception as e:
+            print("AnalysisEngine:", e)
+
+        try:
+            if callback:
+                await self._loop.run_in_executor(self._executor, callback, anime)
+        except Exception as e:
+            print("AnalysisEngine:", e)
+        finally:
+            self._settle()
+
+    def _settle(self):
+        """
+        单个动画结束后更新计数，最后一个动画结束时发出一次批次完成信号
+        """
+        with self._lock:
+            self._running -= 1
+            self._completed += 1
+            self._pending -= 1
+            self._batch_count += 1
+            batch_finished = self._pending == 0
+            batch_count = self._batch_count
+            if batch_finished:
+                self._batch_count = 0
+                self._idle.set()
+
+        if batch_finished:
+            self.analysis.batch_finished.emit(batch_count)
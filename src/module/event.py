@@ -0,0 +1,34 @@
+import threading
+
+
+class Signal:
+    def __init__(self):
+        """
+        不依赖Qt的简易信号，接口与Qt信号一致(connect/disconnect/emit)。
+        回调在调用emit的线程中执行，GUI中需自行转发到主线程
+        """
+        self._lock = threading.Lock()
+        self._slots = []
+
+    def connect(self, slot):
+        """
+        :param slot: 信号发出时调用的函数
+        """
+        with self._lock:
+            self._slots.append(slot)
+
+    def disconnect(self, slot):
+        """
+        :param slot: 已连接的函数
+        """
+        with self._lock:
+            self._slots.remove(slot)
+
+    def emit(self, *args):
+        """
+        依次调用所有已连接的函数
+        """
+        with self._lock:
+            slots = list(self._slots)
+        for slot in slots:
+            slot(*args)
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import threading
+
+from src.module.config import journalFolder
+
+
+SYNC_INTERVAL = 64  # 每记录多少条操作同步一次磁盘
+
+
+def writeDurable(path, content):
+    """
+    原子地写入文件，写入的内容在返回前已同步到磁盘
+    :param path: 文件路径
+    :param content: 文件内容(bytes)
+    """
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class RenameJournal:
+    def __init__(self, folder=None, sync_interval=SYNC_INTERVAL):
+        """
+        重命名日志。重命名前写入完整的计划(plan.json)，执行时向journal.log追加已完成的操作，
+        程序中断后可根据日志继续或撤销重命名
+        :param folder: 日志文件夹，默认为配置文件夹下的journal
+        :param sync_interval: 每记录多少条操作同步一次磁盘
+        """
+        self.folder = folder or journalFolder()
+        self.sync_interval = sync_interval
+        self.plan_path = os.path.join(self.folder, "plan.json")
+        self.log_path = os.path.join(self.folder, "journal.log")
+
+        self._file = None
+        self._unsynced = 0
+        self._lock = threading.Lock()  # 多个文件夹组同时记录
+
+    def exists(self):
+        """
+        :return: 是否存在未完成的重命名
+        """
+        return os.path.exists(self.plan_path)
+
+    def begin(self, moves):
+        """
+        写入重命名计划并开始记录，计划写入磁盘后才会返回
+        :param moves: [(原路径, 新路径)]
+        """
+        if self.exists():
+            raise RuntimeError("存在未完成的重命名，请先继续或撤销")
+
+        plan = {"version": 1, "created": time.time(), "moves": [list(move) for move in moves]}
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+        writeDurable(self.plan_path, json.dumps(plan, ensure_ascii=False).encode("utf-8"))
+        self.open()
+
+    def open(self):
+        """
+        打开日志以追加记录，用于继续或撤销未完成的重命名
+        """
+        if self._file is None:
+            self._file = open(self.log_path, "a", encoding="utf-8")
+
+    def load(self):
+        """
+        读取未完成的重命名
+        :return: (重命名计划, 日志记录列表)，不存在时返回(None, [])
+        """
+        if not self.exists():
+            return None, []
+
+        with open(self.plan_path, "rb") as file:
+            moves = [tuple(move) for move in json.load(file)["moves"]]
+
+        entries = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # 中断时写入一半的最后一行
+        return moves, entries
+
+    def record(self, op, **data):
+        """
+        追加一条操作记录，立即写入文件，每sync_interval条同步一次磁盘。
+        程序中断时只会丢失正在执行的操作，系统崩溃时才会丢失未同步的记录
+        :param op: 操作类型，如 start, move, mkdir, undo, rollback
+        :param data: 操作内容
+        """
+        line = json.dumps({"op": op, **data}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_interval:
+                self._sync()
+
+    def sync(self):
+        """
+        将已记录的操作同步到磁盘
+        """
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        if self._file and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def close(self):
+        """
+        同步并关闭日志，保留日志文件
+        """
+        if self._file:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def finish(self):
+        """
+        重命名全部完成或已撤销，删除计划与日志
+        """
+        self.close()
+        for path in (self.plan_path, self.log_path):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,113 @@
+import os
+import re
+import anitopy
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+# 忽略文件名中特殊字符
+PATTERN_IGNORED = re.compile('|'.join(["BD-BOX", "BD", "DVD", "- TV", "- TV + OAD"]))
+ANITOPY_OPTIONS = {'allowed_delimiters': ' .-+[]'}
+
+CACHE_SIZE = 65536  # 缓存的文件名数量
+PROCESS_THRESHOLD = 5000  # 批量解析的文件名超过此数量时使用多进程
+
+
+def normalizeName(file_name):
+    """
+    移除文件名中的特殊字符，作为解析与缓存的键
+    :param file_name: 完整的文件名
+    :return: 处理后的文件名
+    """
+    return PATTERN_IGNORED.sub('', file_name).strip()
+
+
+def parseNormalized(names):
+    """
+    使用anitopy解析多个已处理的文件名，供子进程调用
+    :param names: 处理后的文件名列表
+    :return: 解析结果列表，无法解析(如文件名只包含特殊字符)时为空字典
+    """
+    return [anitopy.parse(name, options=ANITOPY_OPTIONS) or {} for name in names]
+
+
+class FilenameParser:
+    def __init__(self, cache_size=CACHE_SIZE):
+        """
+        文件名解析服务，缓存anitopy的完整解析结果，相同或仅特殊字符不同的文件名只解析一次
+        :param cache_size: 缓存的文件名数量
+        """
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+    def _put(self, key, result):
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse(self, file_name):
+        """
+        解析文件名
+        :param file_name: 完整的文件名
+        :return: anitopy的全部解析结果(副本)
+        """
+        key = normalizeName(file_name)
+        result = self._get(key)
+        if result is None:
+            result = parseNormalized([key])[0]
+            self._put(key, result)
+        return dict(result)
+
+    def parseBatch(self, file_names, processes=None):
+        """
+        批量解析文件名，数量较多时分配到多个进程
+        :param file_names: 完整的文件名列表
+        :param processes: 进程数量，默认为CPU核心数
+        :return: 与file_names顺序一致的解析结果列表
+        """
+        keys = [normalizeName(file_name) for file_name in file_names]
+        missing = [key for key in dict.fromkeys(keys) if self._get(key) is None]
+
+        if len(missing) >= PROCESS_THRESHOLD:
+            processes = processes or os.cpu_count() or 1
+            chunk_size = -(-len(missing) // (processes * 4))
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                results = [result for chunk in executor.map(parseNormalized, chunks) for result in chunk]
+        else:
+            results = parseNormalized(missing)
+
+        parsed = dict(zip(missing, results))
+        for key, result in parsed.items():
+            self._put(key, result)
+
+        results = []
+        for key in keys:
+            result = parsed.get(key)
+            if result is None:
+                result = self._get(key)
+            if result is None:
+                result = parseNormalized([key])[0]
+            results.append(dict(result))
+        return results
+
+    def title(self, file_name):
+        """
+        :param file_name: 完整的文件名
+        :return: 动画罗马名，若无法识别则返回None
+        """
+        return self.parse(file_name).get("anime_title")
+
+
+filename_parser = FilenameParser()
@@ -0,0 +1,126 @@
+import os
+
+
+def pathKey(path):
+    """
+    用于比较的路径，统一分隔符与大小写(仅Windows)
+    :param path: 文件夹路径
+    :return: 比较用的路径
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def parentKeys(key):
+    """
+    :param key: pathKey处理后的路径
+    :return: 该路径全部上级文件夹的生成器
+    """
+    index = key.rfind(os.sep)
+    while index > 0:
+        yield key[:index]
+        index = key.rfind(os.sep, 0, index)
+
+
+def isInside(folder_key, key, sep=os.sep):
+    """
+    判断路径是否位于文件夹之内，文件夹可以是驱动器或网络共享的根目录
+    :param folder_key: pathKey处理后的文件夹路径
+    :param key: pathKey处理后的路径
+    :param sep: 路径分隔符
+    :return: 路径是否位于文件夹之内(不含文件夹本身)
+    """
+    prefix = folder_key.rstrip(sep) + sep
+    return len(key) > len(prefix) and key.startswith(prefix)
+
+
+class RenamePlan:
+    def __init__(self, anime_list):
+        """
+        重命名计划。一次性建立全部 原路径→新路径 的关系，检查所有冲突，
+        并按依赖关系排序：新路径是另一个动画的原路径时，后者先移动；互相占用时经临时名称中转
+        :param anime_list: 动画列表，只包含分析成功的动画
+        """
+        self.errors = []  # 全部冲突
+        self.moves = []  # 排序后的 [(原路径, 新路径)]，包含临时名称的中转
+
+        # (动画, 原路径, 新路径, 原路径的比较键, 新路径的比较键)，跳过无需移动的动画
+        entries = [(anime, anime["file_path"], anime["final_path"], pathKey(anime["file_path"]), pathKey(anime["final_path"]))
+                   for anime in anime_list if anime["final_name"] != ""]
+        entries = [entry for entry in entries if entry[3] != entry[4]]
+        self._check(entries)
+        if not self.errors:
+            self._order(entries)
+
+    def _check(self, entries):
+        sources = {}
+        targets = {}
+        for anime, _, _, source_key, target_key in entries:
+            sources[source_key] = anime
+            targets.setdefault(target_key, []).append(anime)
+
+        for anime, source, target, source_key, target_key in entries:
+            name = anime["name_cn"] or anime["file_name"]
+
+            first = targets[target_key][0] is anime  # 同一新路径的冲突只报告一次
+            if len(targets[target_key]) > 1 and first:
+                names = "、".join(item["name_cn"] or item["file_name"] for item in targets[target_key])
+                self.errors.append(f"存在重复的重命名结果：{names}")
+
+            # 命名格式中的绝对路径或 .. 会使新路径离开原文件夹所在的目录
+            if not isInside(pathKey(anime["final_dir"]), target_key):
+                self.errors.append(f"重命名结果不在原文件夹所在的目录中：{name}")
+
+            if source_key in parentKeys(target_key):
+                self.errors.append(f"无法将动画重命名到其子目录中：{name}")
+            elif not sources.keys().isdisjoint(parentKeys(target_key)):
+                self.errors.append(f"重命名结果位于另一个待重命名的文件夹中：{name}")
+
+            if not sources.keys().isdisjoint(parentKeys(source_key)):
+                self.errors.append(f"动画位于另一个待重命名的文件夹中：{name}")
+
+            # 新路径已存在，且不会在本次重命名中移走(仅大小写不同的同一文件夹除外)
+            if first and target_key not in sources and os.path.lexists(target):
+                if not (os.path.exists(source) and os.path.samefile(source, target)):
+                    self.errors.append(f"重命名结果已存在：{target}")
+
+    def _order(self, entries):
+        # 每个新路径最多是一个原路径，依赖关系只会形成链或环
+        by_source = {source_key: (source, target) for _, source, target, source_key, _ in entries}
+        target_keys = {source_key: target_key for _, _, _, source_key, target_key in entries}
+        placed = set()
+
+        for _, _, _, source_key, _ in entries:
+            if source_key in placed:
+                continue
+
+            # 沿新路径找到链的末端，途中回到起点则为环
+            chain = [source_key]
+            while True:
+                next_key = target_keys[chain[-1]]
+                if next_key not in by_source or next_key in placed or next_key == chain[0]:
+                    break
+                chain.append(next_key)
+            cycle = next_key == chain[0]
+
+            if cycle:
+                # 先将起点移到临时名称，其余按链倒序移动，最后从临时名称移到新路径
+                first_source, first_target = by_source[chain[0]]
+                temp = self._tempPath(first_source)
+                self.moves.append((first_source, temp))
+                self.moves.extend(by_source[key] for key in reversed(chain[1:]))
+                self.moves.append((temp, first_target))
+            else:
+                self.moves.extend(by_source[key] for key in reversed(chain))
+            placed.update(chain)
+
+    def _tempPath(self, source):
+        """
+        :param source: 原路径
+        :return: 原路径同级的临时名称
+        """
+        index = 0
+        while True:
+            temp = f"{source}.renaming{index or ''}"
+            if not os.path.lexists(temp):
+                return temp
+            index += 1
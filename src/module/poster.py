@@ -0,0 +1,134 @@
+import os
+import sqlite3
+import hashlib
+import tempfile
+import mimetypes
+import threading
+
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+from src.module.api.client import client
+from src.module.api.singleflight import SingleFlight
+from src.module.config import posterFolder
+
+
+CHUNK_SIZE = 64 * 1024  # 下载时每次写入的字节数
+
+
+class PosterStore:
+    def __init__(self, folder=None):
+        """
+        海报存储。下载时边接收边写入临时文件，完成后按内容哈希命名并原子地移动到位，
+        相同内容的海报只保存一份
+        :param folder: 海报文件夹，默认为配置文件夹下的poster
+        """
+        self.folder = folder or posterFolder()
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(self.folder, "index.db"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS poster (url TEXT PRIMARY KEY, file_name TEXT NOT NULL)")
+        self._db.commit()
+
+    def path(self, poster_url):
+        """
+        查询已下载的海报
+        :param poster_url: 海报图片地址
+        :return: 海报路径，未下载则返回None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT file_name FROM poster WHERE url = ?", (poster_url,)).fetchone()
+
+        if row:
+            poster_path = os.path.join(self.folder, row[0])
+            if os.path.exists(poster_path):
+                return poster_path
+
+    def fetch(self, poster_url):
+        """
+        下载海报，已下载则直接返回。同一地址的并发下载会合并为一次
+        :param poster_url: 海报图片地址
+        :return: 海报路径
+        """
+        return self.path(poster_url) or self._flight.do(poster_url, self._download, poster_url)
+
+    def prefetch(self, poster_urls, workers=8):
+        """
+        并发下载多张海报，单张失败不影响其他海报
+        :param poster_urls: 海报图片地址列表
+        :param workers: 同时下载的数量
+        :return: {海报图片地址: 海报路径}，下载失败的海报不包含在结果中
+        """
+        def fetch(poster_url):
+            try:
+                return poster_url, self.fetch(poster_url)
+            except Exception as e:
+                print("PosterStore:", e)
+                return poster_url, None
+
+        poster_urls = list(dict.fromkeys(url for url in poster_urls if url))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return {url: path for url, path in executor.map(fetch, poster_urls) if path}
+
+    def _download(self, poster_url):
+        """
+        流式下载海报到临时文件，校验完整后按内容哈希命名
+        :param poster_url: 海报图片地址
+        :return: 海报路径
+        """
+        # 合并的请求可能已由其他线程下载完成
+        poster_path = self.path(poster_url)
+        if poster_path:
+            return poster_path
+
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file, client.get(poster_url, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    file.write(chunk)
+                    digest.update(chunk)
+                content_type = response.headers.get("Content-Type", "")
+
+            file_name = digest.hexdigest() + posterExtension(poster_url, content_type)
+            poster_path = os.path.join(self.folder, file_name)
+            os.replace(temp_path, poster_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO poster VALUES (?, ?)", (poster_url, file_name))
+            self._db.commit()
+
+        return poster_path
+
+
+def posterExtension(poster_url, content_type):
+    """
+    :param poster_url: 海报图片地址
+    :param content_type: 响应的Content-Type
+    :return: 海报的扩展名
+    """
+    extension = os.path.splitext(urlsplit(poster_url).path)[1]
+    if extension:
+        return extension.lower()
+    return mimetypes.guess_extension(content_type.split(";")[0].strip()) or ".jpg"
+
+
+_poster_store = None
+_poster_store_lock = threading.Lock()
+
+
+def posterStore():
+    """
+    获取共用的海报存储，首次调用时创建
+    :return: PosterStore
+    """
+    global _poster_store
+    with _poster_store_lock:
+        if _poster_store is None:
+            _poster_store = PosterStore()
+        return _poster_store
@@ -1,45 +1,312 @@
 import os
+import threading
 
-from PySide6.QtCore import QObject
+from concurrent.futures import ThreadPoolExecutor
 
+from src.module.journal import RenameJournal
+from src.module.planner import RenamePlan, pathKey
+from src.module.transfer import moveTree, finishMove, discardPartial
 
-class Rename(QObject):
+
+PARALLELISM = 8  # 同时执行的重命名数量
+
+
+class Rename:
     @staticmethod
     def check(anime_list):
         """
-        重命名条件检查
+        重命名条件检查，一次检查出全部冲突
         :param anime_list: 动画列表
-        :return: 如果不满足重命名条件，返回错误信息
+        :return: 错误信息列表，满足重命名条件时为空
         """
         final_path_list = [anime["final_path"] for anime in anime_list]
 
         if not anime_list:
-            return "请先添加动画"
+            return ["请先添加动画"]
 
         if len(set(final_path_list)) == 1 and len(final_path_list) != 1:  # 排除只有一个动画的情况
-            return "请先开始分析"
-
-        if len(set(final_path_list)) != len(final_path_list):
-            return "存在重复的重命名结果"
+            return ["请先开始分析"]
 
         # if "" in final_path_list:
-        #     return "存在分析失败的动画，请先移除"
+        #     return ["存在分析失败的动画，请先移除"]
+
+        return RenamePlan(anime_list).errors
+
+    @staticmethod
+    def start(anime_list, journal=None, progress=None, parallelism=PARALLELISM):
+        """
+        按计划重命名，先写入重命名日志，中断后可通过resume继续或rollback撤销
+        :param anime_list: 动画列表
+        :param journal: RenameJournal，默认使用配置文件夹下的日志
+        :param progress: 跨设备移动时的进度回调，参数为 (原路径, 已复制字节数, 总字节数)
+        :param parallelism: 同时执行的重命名数量
+        """
+        plan = RenamePlan(anime_list)
+        if plan.errors:
+            raise ValueError(plan.errors[0])
 
-        for anime in anime_list:
-            if os.path.commonpath([anime["file_name"]]) == os.path.commonpath([anime["file_name"], anime["final_name"]]):
-                return f"无法将动画重命名到其子目录中：{anime['name_cn']}"
+        journal = journal or RenameJournal()
+        journal.begin(plan.moves)
+        runJournaled(journal, executeMoves, plan.moves, journal, (), progress, parallelism)
+
+    @staticmethod
+    def pending(journal=None):
+        """
+        :param journal: RenameJournal，默认使用配置文件夹下的日志
+        :return: 是否存在未完成的重命名
+        """
+        return (journal or RenameJournal()).exists()
 
     @staticmethod
-    def start(anime_list):
-        # 开始命名
-        for anime in anime_list:
-            if anime["final_name"] != "":
-                current_path = anime["file_path"]
-                final_path = anime["final_path"]
-
-                # 确保final_path存在
-                if not os.path.exists(os.path.dirname(final_path)):
-                    os.makedirs(os.path.dirname(final_path))
-
-                # 重命名
-                os.rename(current_path, final_path)
+    def resume(journal=None, progress=None, parallelism=PARALLELISM):
+        """
+        继续未完成的重命名，若中断前正在撤销，则继续撤销
+        :param journal: RenameJournal，默认使用配置文件夹下的日志
+        :param progress: 跨设备移动时的进度回调，参数为 (原路径, 已复制字节数, 总字节数)
+        :param parallelism: 同时执行的重命名数量
+        :return: 计划中的重命名数量
+        """
+        journal = journal or RenameJournal()
+        moves, entries = journal.load()
+        if moves is None:
+            return 0
+
+        journal.open()
+        if any(entry["op"] == "rollback" for entry in entries):
+            runJournaled(journal, undoMoves, moves, entries, journal, progress, parallelism)
+        else:
+            runJournaled(journal, executeMoves, moves, journal, entries, progress, parallelism)
+        return len(moves)
+
+    @staticmethod
+    def rollback(journal=None, progress=None, parallelism=PARALLELISM):
+        """
+        撤销未完成的重命名中已完成的部分，并删除重命名时创建的空文件夹
+        :param journal: RenameJournal，默认使用配置文件夹下的日志
+        :param progress: 跨设备移动时的进度回调，参数为 (原路径, 已复制字节数, 总字节数)
+        :param parallelism: 同时执行的重命名数量
+        :return: 计划中的重命名数量
+        """
+        journal = journal or RenameJournal()
+        moves, entries = journal.load()
+        if moves is None:
+            return 0
+
+        journal.open()
+        if not any(entry["op"] == "rollback" for entry in entries):
+            journal.record("rollback")
+        runJournaled(journal, undoMoves, moves, entries, journal, progress, parallelism)
+        return len(moves)
+
+
+def isMoved(current_path, final_path):
+    """
+    :return: 是否已重命名(原路径不存在且新路径存在)
+    """
+    return not os.path.lexists(current_path) and os.path.lexists(final_path)
+
+
+def progressFor(progress, path):
+    """
+    :return: 带有原路径的进度回调，progress为None时返回None
+    """
+    if progress:
+        return lambda copied, total: progress(path, copied, total)
+
+
+def runJournaled(journal, func, *args):
+    """
+    执行重命名或撤销，全部完成后删除日志；出错时同步并保留日志，再抛出异常
+    :param journal: RenameJournal
+    :param func: executeMoves 或 undoMoves
+    """
+    try:
+        func(*args)
+    except BaseException:
+        journal.close()
+        raise
+    journal.finish()
+
+
+def groupMoves(moves, indexes):
+    """
+    按依赖关系分组，互相依赖的重命名(新路径是另一个重命名的原路径，如链与环)归入同一组。
+    新文件夹已预先创建，不同组之间互不影响，可以同时执行
+    :param moves: [(原路径, 新路径)]
+    :param indexes: 需要分组的重命名序号
+    :return: 各组的重命名序号列表，组内保持计划中的顺序
+    """
+    parent = {index: index for index in indexes}
+
+    def find(index):
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    def union(a, b):
+        parent[find(a)] = find(b)
+
+    by_source = {pathKey(moves[index][0]): index for index in indexes}
+
+    for index in indexes:
+        target_index = by_source.get(pathKey(moves[index][1]))
+        if target_index is not None:
+            union(index, target_index)
+
+    groups = {}
+    for index in indexes:
+        groups.setdefault(find(index), []).append(index)
+    return list(groups.values())
+
+
+def runGroups(groups, func, parallelism):
+    """
+    同时执行多组重命名，组内依次执行。任意一组出错后，其他组不再开始新的重命名
+    :param groups: 各组的重命名序号列表
+    :param func: 执行一组重命名的函数，参数为 (重命名序号列表, 停止信号)
+    :param parallelism: 同时执行的重命名数量
+    """
+    stop = threading.Event()
+
+    def run(group):
+        try:
+            func(group, stop)
+        except BaseException:
+            stop.set()
+            raise
+
+    if parallelism <= 1 or len(groups) <= 1:
+        for group in groups:
+            run(group)
+        return
+
+    with ThreadPoolExecutor(max_workers=parallelism) as executor:
+        futures = [executor.submit(run, group) for group in groups]
+    for future in futures:
+        future.result()  # 抛出第一个出错的组的异常
+
+
+def createFolders(moves, indexes, journal, parallelism):
+    """
+    预先创建全部新路径的上级文件夹，先记录再创建，撤销时删除
+    :param moves: [(原路径, 新路径)]
+    :param indexes: 需要执行的重命名序号
+    :param journal: RenameJournal
+    :param parallelism: 同时检查与创建的文件夹数量
+    """
+    folders = list(dict.fromkeys(os.path.dirname(moves[index][1]) for index in indexes))
+
+    def missingFolders(folder):
+        missing = []
+        while folder and not os.path.exists(folder):
+            missing.append(folder)
+            folder = os.path.dirname(folder)
+        return missing
+
+    with ThreadPoolExecutor(max_workers=max(parallelism, 1)) as executor:
+        missing = sorted({path for paths in executor.map(missingFolders, folders) for path in paths},
+                         key=lambda path: (path.count(os.sep), path))
+        if not missing:
+            return
+
+        for folder in missing:
+            journal.record("mkdir", path=folder)
+        journal.sync()
+
+        # 按层级创建，同一层级的文件夹同时创建
+        levels = {}
+        for folder in missing:
+            levels.setdefault(folder.count(os.sep), []).append(folder)
+        for level in sorted(levels):
+            list(executor.map(lambda folder: os.makedirs(folder, exist_ok=True), levels[level]))
+
+
+def executeMoves(moves, journal, entries=(), progress=None, parallelism=PARALLELISM):
+    """
+    执行重命名，并在日志中记录创建的文件夹、开始与完成的重命名。
+    先创建全部新文件夹，再按依赖关系分组同时执行
+    :param moves: [(原路径, 新路径)]
+    :param journal: RenameJournal
+    :param entries: 中断前的日志记录列表
+    :param progress: 跨设备移动时的进度回调，参数为 (原路径, 已复制字节数, 总字节数)
+    :param parallelism: 同时执行的重命名数量
+    """
+    done = {entry["index"] for entry in entries if entry["op"] == "move"}
+    started = {entry["index"] for entry in entries if entry["op"] == "start"}
+    indexes = [index for index in range(len(moves)) if index not in done]
+    createFolders(moves, indexes, journal, parallelism)
+
+    def moveGroup(group, stop):
+        vacated = set()
+        for index in group:
+            if stop.is_set():
+                return
+            current_path, final_path = moves[index]
+
+            # 中断前已开始并完成，但未来得及记录
+            if index in started and isMoved(current_path, final_path):
+                journal.record("move", index=index)
+                continue
+
+            # 新路径是本组已移走的原路径时，先同步日志，避免系统崩溃后丢失前一次重命名的记录
+            if pathKey(final_path) in vacated:
+                journal.sync()
+
+            # 重命名，跨设备时复制后删除原文件夹
+            journal.record("start", index=index)
+            moveTree(current_path, final_path, progressFor(progress, current_path))
+            journal.record("move", index=index)
+            vacated.add(pathKey(current_path))
+
+    runGroups(groupMoves(moves, indexes), moveGroup, parallelism)
+
+
+def undoMoves(moves, entries, journal, progress=None, parallelism=PARALLELISM):
+    """
+    撤销已完成的重命名，组内倒序执行。
+    只撤销日志中已开始的重命名，未记录完成的那一次再根据文件系统的状态判断是否已完成，
+    否则交换、循环重命名在执行前后的文件系统状态相同，无法区分
+    :param moves: [(原路径, 新路径)]
+    :param entries: 日志记录列表
+    :param journal: RenameJournal
+    :param progress: 跨设备移动时的进度回调，参数为 (原路径, 已复制字节数, 总字节数)
+    :param parallelism: 同时执行的重命名数量
+    """
+    started = {entry["index"] for entry in entries if entry["op"] in ("start", "move")}
+    undone = {entry["index"] for entry in entries if entry["op"] == "undo"}
+    indexes = [index for index in range(len(moves)) if index in started and index not in undone]
+
+    def undoGroup(group, stop):
+        vacated = set()
+        for index in reversed(group):
+            if stop.is_set():
+                return
+            current_path, final_path = moves[index]
+
+            # 先完成中断前已校验的跨设备复制，再确认重命名已完成、撤销尚未完成
+            finishMove(final_path, current_path)
+            finishMove(current_path, final_path)
+            discardPartial(final_path)
+            discardPartial(current_path)
+
+            if not isMoved(current_path, final_path):
+                continue
+
+            if pathKey(current_path) in vacated:
+                journal.sync()
+
+            os.makedirs(os.path.dirname(current_path), exist_ok=True)
+            moveTree(final_path, current_path, progressFor(progress, final_path))
+            journal.record("undo", index=index)
+            vacated.add(pathKey(final_path))
+
+    runGroups(groupMoves(moves, indexes), undoGroup, parallelism)
+
+    # 删除重命名时创建的文件夹，非空则保留
+    for entry in reversed(entries):
+        if entry["op"] == "mkdir":
+            try:
+                os.rmdir(entry["path"])
+            except OSError:
+                pass
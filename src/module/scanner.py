@@ -0,0 +1,79 @@
+import os
+
+
+IGNORED_NAMES = {"@eaDir", "#recycle", "$RECYCLE.BIN", "System Volume Information"}  # NAS 与系统生成的文件夹
+
+
+class PathIndex:
+    def __init__(self, paths=()):
+        """
+        基于哈希集合的路径索引，用于O(1)判断文件夹是否已添加
+        :param paths: 初始路径
+        """
+        self._paths = set()
+        for path in paths:
+            self.add(path)
+
+    @staticmethod
+    def key(path):
+        """
+        :param path: 文件夹路径
+        :return: 统一大小写与分隔符后的路径
+        """
+        return os.path.normcase(os.path.normpath(path))
+
+    def add(self, path):
+        """
+        :param path: 文件夹路径
+        :return: 路径此前不存在时返回True
+        """
+        key = self.key(path)
+        if key in self._paths:
+            return False
+        self._paths.add(key)
+        return True
+
+    def remove(self, path):
+        self._paths.discard(self.key(path))
+
+    def __contains__(self, path):
+        return self.key(path) in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+
+def scanLibrary(root, depth=1, path_index=None):
+    """
+    使用os.scandir遍历动画库，逐个输出指定深度的文件夹，不会一次性读取整个目录树
+    :param root: 动画库根目录
+    :param depth: 动画文件夹相对根目录的深度，0表示根目录本身即为动画文件夹
+    :param path_index: 用于去重的PathIndex，已存在的文件夹不会输出
+    :return: 动画文件夹路径的生成器
+    """
+    if not os.path.isdir(root):
+        return
+
+    path_index = path_index if path_index is not None else PathIndex()
+    stack = [(os.path.normpath(root), 0)]
+
+    while stack:
+        path, level = stack.pop()
+
+        if level == depth:
+            if path_index.add(path):
+                yield path
+            continue
+
+        try:
+            with os.scandir(path) as entries:
+                folders = [entry.path for entry in entries
+                           if entry.is_dir(follow_symlinks=False)
+                           and not entry.name.startswith(".") and entry.name not in IGNORED_NAMES]
+        except OSError as e:
+            print("scanLibrary:", e)
+            continue
+
+        # 倒序入栈，使输出顺序与文件名顺序一致
+        for folder in sorted(folders, reverse=True):
+            stack.append((folder, level + 1))
@@ -0,0 +1,120 @@
+import os
+import arrow
+import string
+import threading
+
+from functools import lru_cache
+
+from src.module.config import config_store, readConfig
+
+
+class RenameTemplate:
+    def __init__(self, rename_format, date_format):
+        """
+        预编译的命名格式，渲染时不再解析格式字符串
+        :param rename_format: 命名格式，如 {fs_name_cn}/[{typecode}] [{release}] {name_jp}
+        :param date_format: 日期格式，如 YYMMDD
+        """
+        self.rename_format = rename_format
+        self.date_format = date_format
+
+        # 编译为 (普通文字, 变量名, 格式说明, 转换符) 的列表
+        formatter = string.Formatter()
+        self._parts = [(literal, field, spec, conversion)
+                       for literal, field, spec, conversion in formatter.parse(rename_format)]
+        self._formatter = formatter
+
+    def render(self, anime):
+        """
+        根据动画信息生成重命名结果
+        :param anime: 动画信息字典(需已写入release与release_end)
+        :return: 重命名后的文件名
+        """
+        result = []
+        for literal, field, spec, conversion in self._parts:
+            result.append(literal)
+            if field is None:
+                continue
+
+            # 普通变量直接取值，带下标或属性的变量交由Formatter处理
+            if field in anime:
+                value = anime[field]
+            else:
+                value, _ = self._formatter.get_field(field, (), anime)
+
+            if conversion:
+                value = self._formatter.convert_field(value, conversion)
+            result.append(format(value, spec) if spec else str(value))
+
+        return "".join(result)
+
+    def apply(self, anime):
+        """
+        生成重命名结果，直接将新值写入anime
+        :param anime: 动画信息字典
+        """
+        # 格式化release日期到字典
+        anime["release"] = formatDate(anime["release_raw"], self.date_format)
+        anime["release_end"] = formatDate(anime["release_end_raw"], self.date_format)
+
+        # 写入final_name到字典
+        final_name = self.render(anime)
+        anime["final_name"] = final_name
+
+        # 写入final_dir到字典
+        final_dir = os.path.dirname(anime["file_path"])
+        anime["final_dir"] = final_dir
+
+        # 写入final_path到字典
+        anime["final_path"] = os.path.join(final_dir, os.path.normpath(final_name))  # 保证斜杠分隔符在windows下正确
+
+    def applyAll(self, anime_list):
+        """
+        批量生成重命名结果，跳过未分析成功的动画(分析的任一阶段失败时final_name为空)
+        :param anime_list: 动画列表
+        """
+        for anime in anime_list:
+            if anime["final_name"]:
+                self.apply(anime)
+
+
+@lru_cache(maxsize=4096)
+def formatDate(date_raw, date_format):
+    """
+    格式化日期，相同的日期与格式只计算一次
+    :param date_raw: 原始日期，如 2022-10-05
+    :param date_format: 日期格式
+    :return: 格式化后的日期
+    """
+    return arrow.get(date_raw).format(date_format)
+
+
+_template = None
+_template_lock = threading.RLock()
+
+
+def renameTemplate():
+    """
+    获取当前配置对应的命名格式，配置修改后重新编译
+    :return: RenameTemplate
+    """
+    global _template
+    config_store.check()  # 配置文件被外部修改时，会通过changed清除已编译的命名格式
+
+    with _template_lock:
+        if _template is None:
+            _template = RenameTemplate(readConfig("Format", "rename_format"), readConfig("Format", "date_format"))
+        return _template
+
+
+def _clearTemplate(changed=None):
+    """
+    配置修改后清除已编译的命名格式
+    :param changed: 修改的配置项，重新加载时为None
+    """
+    global _template
+    with _template_lock:
+        _template = None
+
+
+config_store.changed.connect(_clearTemplate)
@@ -0,0 +1,230 @@
+import os
+import sys
+import errno
+import shutil
+import hashlib
+
+
+CHUNK_SIZE = 64 * 1024 * 1024  # 每次内核复制的字节数，也是进度回调的间隔
+READ_SIZE = 1024 * 1024  # 普通读写与计算摘要时每次读取的字节数
+PARTIAL_SUFFIX = ".partial"  # 正在复制
+COPIED_SUFFIX = ".copied"  # 已复制并校验，等待删除原文件夹
+
+
+def moveTree(source, target, progress=None):
+    """
+    移动文件夹。同一设备上直接重命名，跨设备(EXDEV)时复制到目标设备并校验后再删除原文件夹
+    :param source: 原路径
+    :param target: 新路径
+    :param progress: 跨设备复制时的进度回调，参数为 (已复制字节数, 总字节数)
+    """
+    if finishMove(source, target):
+        return
+
+    try:
+        os.rename(source, target)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        copyMove(source, target, progress)
+
+
+def finishMove(source, target):
+    """
+    完成中断前已复制并校验的跨设备移动
+    :return: 存在已校验的副本时返回True
+    """
+    copied = target + COPIED_SUFFIX
+    if not os.path.isdir(copied):
+        return False
+
+    if os.path.lexists(source):
+        removeTree(source)
+    os.rename(copied, target)
+    return True
+
+
+def discardPartial(target):
+    """
+    删除中断时未复制完成的临时文件夹
+    """
+    partial = target + PARTIAL_SUFFIX
+    if os.path.lexists(partial):
+        removeTree(partial)
+
+
+def copyMove(source, target, progress=None):
+    """
+    跨设备移动：复制到新路径旁的临时文件夹，逐个文件比较内容摘要，并比较整个文件夹的结构与大小，
+    校验后标记为已复制，删除原文件夹后再改为新路径。
+    中断后重新调用moveTree，会重新复制或继续删除原文件夹
+    """
+    discardPartial(target)
+    partial = target + PARTIAL_SUFFIX
+
+    files = listTree(source)
+    total = sum(size for size in files.values() if size > 0)
+    copied = 0
+
+    def advance(count):
+        nonlocal copied
+        copied += count
+        if progress:
+            progress(copied, total)
+
+    try:
+        copyTree(source, partial, advance)
+        if listTree(partial) != files:
+            raise OSError(errno.EIO, "复制后的文件夹与原文件夹不一致", source)
+    except Exception:
+        discardPartial(target)
+        raise
+
+    os.rename(partial, target + COPIED_SUFFIX)
+    syncFolder(os.path.dirname(target))  # 确保副本与标记已写入磁盘，再删除原文件夹
+    finishMove(source, target)
+
+
+def listTree(path):
+    """
+    :param path: 文件夹路径
+    :return: {相对路径: 文件大小}，文件夹的大小记为-1，符号链接记为-2
+    """
+    files = {}
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        with os.scandir(os.path.join(path, relative)) as entries:
+            for entry in entries:
+                entry_path = os.path.join(relative, entry.name)
+                if entry.is_symlink():
+                    files[entry_path] = -2
+                elif entry.is_dir():
+                    files[entry_path] = -1
+                    stack.append(entry_path)
+                else:
+                    files[entry_path] = entry.stat().st_size
+    return files
+
+
+def copyTree(source, target, advance):
+    """
+    复制文件夹，保留符号链接、权限与修改时间
+    :param advance: 进度回调，参数为新复制的字节数
+    """
+    os.mkdir(target)
+    with os.scandir(source) as entries:
+        for entry in entries:
+            target_path = os.path.join(target, entry.name)
+            if entry.is_symlink():
+                os.symlink(os.readlink(entry.path), target_path)
+            elif entry.is_dir():
+                copyTree(entry.path, target_path, advance)
+            else:
+                copyFile(entry.path, target_path, advance)
+    shutil.copystat(source, target)
+    syncFolder(target)
+
+
+def syncFolder(path):
+    """
+    将文件夹中的目录项同步到磁盘，Windows不支持对文件夹调用fsync，直接跳过
+    :param path: 文件夹路径
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def copyFile(source, target, advance):
+    """
+    复制文件，优先使用copy_file_range或sendfile在内核中复制，数据不经过Python。
+    写入磁盘后重新读取副本，与原文件的摘要不一致时抛出OSError
+    :param advance: 进度回调，参数为新复制的字节数
+    """
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        offset = kernelCopy(src.fileno(), dst.fileno(), size, advance)
+
+        # 不支持内核复制时，从中断处继续使用普通读写
+        if offset < size:
+            src.seek(offset)
+            dst.seek(offset)
+            while True:
+                chunk = src.read(READ_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+                advance(len(chunk))
+
+        # 删除原文件夹前，副本必须已写入磁盘
+        dst.flush()
+        os.fsync(dst.fileno())
+
+        # 丢弃副本的页缓存，使校验读取的是磁盘上的数据
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(dst.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    if fileDigest(source) != fileDigest(target):
+        raise OSError(errno.EIO, "复制后的文件与原文件不一致", source)
+    shutil.copystat(source, target)
+
+
+def fileDigest(path):
+    """
+    :param path: 文件路径
+    :return: 文件内容的BLAKE2b摘要
+    """
+    digest = hashlib.blake2b()
+    with open(path, "rb") as file:
+        while True:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+def kernelCopy(in_fd, out_fd, size, advance):
+    """
+    :return: 已复制的字节数，不支持内核复制时小于size
+    """
+    # 仅Linux的sendfile支持输出到普通文件，macOS等系统要求输出为socket
+    methods = ("copy_file_range", "sendfile") if sys.platform.startswith("linux") else ("copy_file_range",)
+
+    offset = 0
+    for method in methods:
+        copy = getattr(os, method, None)
+        if copy is None:
+            continue
+        try:
+            while offset < size:
+                if method == "copy_file_range":
+                    count = copy(in_fd, out_fd, min(CHUNK_SIZE, size - offset), offset, offset)
+                else:
+                    os.lseek(out_fd, offset, os.SEEK_SET)
+                    count = copy(out_fd, in_fd, offset, min(CHUNK_SIZE, size - offset))
+                if count == 0:
+                    break
+                offset += count
+                advance(count)
+            return offset
+        except OSError as e:
+            # 文件系统或内核不支持，换用下一种方式
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTSOCK):
+                raise
+    return offset
+
+
+def removeTree(path):
+    """
+    删除文件夹或文件
+    """
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
@@ -1,9 +1,10 @@
 import re
-import requests
 import threading
 
 from PySide6.QtCore import QObject, Signal
 
+from src.module.api.client import client
+
 
 class Version(QObject):
     has_update = Signal(bool)
@@ -20,7 +21,7 @@ class Version(QObject):
         :return: 最新的版本号
         """
         url = "https://raw.githubusercontent.com/nuthx/bangumi-renamer/main/build-mac.spec"
-        response = requests.get(url)
+        response = client.get(url, retries=0)  # 启动时同步检查，离线时立即失败
         response_text = response.text.split('\n')
 
         version_raw = response_text[-3].strip()
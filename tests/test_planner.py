@@ -0,0 +1,44 @@
+import ntpath
+import os
+
+from src.module.planner import RenamePlan, isInside
+
+
+def windowsKey(path):
+    return ntpath.normcase(ntpath.normpath(path))
+
+
+def testIsInsideDriveRoot():
+    assert isInside(windowsKey("E:\\"), windowsKey("E:\\Anime"), "\\")
+    assert isInside(windowsKey("E:"), windowsKey("E:\\Anime"), "\\")
+    assert not isInside(windowsKey("E:\\"), windowsKey("D:\\Anime"), "\\")
+    assert not isInside(windowsKey("E:\\"), windowsKey("E:\\"), "\\")
+
+
+def testIsInsideUncShare():
+    assert isInside(windowsKey("\\\\nas\\anime\\"), windowsKey("\\\\nas\\anime\\Frieren"), "\\")
+    assert isInside(windowsKey("\\\\nas\\anime"), windowsKey("\\\\NAS\\Anime\\Frieren"), "\\")
+    assert not isInside(windowsKey("\\\\nas\\anime"), windowsKey("\\\\nas\\anime2\\Frieren"), "\\")
+
+
+def testIsInsideFolder():
+    assert isInside(windowsKey("E:\\Anime"), windowsKey("E:\\Anime\\Frieren"), "\\")
+    assert not isInside(windowsKey("E:\\Anime"), windowsKey("E:\\Anime2\\Frieren"), "\\")
+    assert not isInside(windowsKey("E:\\Anime\\Frieren"), windowsKey("E:\\Anime\\Other"), "\\")
+
+
+def testPlanAllowsFolderUnderRoot():
+    root = os.path.abspath(os.sep)
+    anime = {"file_name": "[Sub] Frieren", "name_cn": "", "final_dir": root,
+             "file_path": os.path.join(root, "bangumi-renamer-missing-source"),
+             "final_name": "bangumi-renamer-missing-target",
+             "final_path": os.path.join(root, "bangumi-renamer-missing-target")}
+    assert RenamePlan([anime]).errors == []
+
+
+def testPlanRejectsTargetOutsideFolder(tmp_path):
+    folder = str(tmp_path / "anime")
+    anime = {"file_name": "[Sub] Frieren", "name_cn": "", "final_dir": folder,
+             "file_path": os.path.join(folder, "[Sub] Frieren"),
+             "final_name": "../Frieren", "final_path": os.path.join(folder, "..", "Frieren")}
+    assert RenamePlan([anime]).errors == ["重命名结果不在原文件夹所在的目录中：[Sub] Frieren"]
@@ -0,0 +1,98 @@
+import os
+
+from src.module.journal import RenameJournal
+from src.module.planner import RenamePlan
+from src.module.rename import Rename
+
+
+def makeAnime(folder, name, final_name):
+    path = os.path.join(folder, name)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "name.txt"), "w") as file:
+        file.write(name)
+    return {"file_name": name, "name_cn": "", "file_path": path, "final_dir": folder, "final_name": final_name,
+            "final_path": os.path.join(folder, final_name)}
+
+
+def readName(folder, name):
+    with open(os.path.join(folder, name, "name.txt")) as file:
+        return file.read()
+
+
+def makeJournal(tmp_path):
+    folder = tmp_path / "journal"
+    folder.mkdir()
+    return RenameJournal(str(folder))
+
+
+def interrupt(journal, moves, executed, started=None):
+    """
+    模拟中断：写入计划，执行前 executed 个重命名，可选地开始第 started 个但未记录完成
+    """
+    journal.begin(moves)
+    for index, (current_path, final_path) in enumerate(moves[:executed]):
+        journal.record("start", index=index)
+        os.rename(current_path, final_path)
+        journal.record("move", index=index)
+    if started is not None:
+        journal.record("start", index=started)
+        os.rename(*moves[started])
+    journal.close()
+
+
+def testRollbackUnexecutedSwap(tmp_path):
+    folder = str(tmp_path / "anime")
+    anime_list = [makeAnime(folder, "A", "B"), makeAnime(folder, "B", "A")]
+    journal = makeJournal(tmp_path)
+    interrupt(journal, RenamePlan(anime_list).moves, 0)
+
+    Rename.rollback(journal)
+
+    assert sorted(os.listdir(folder)) == ["A", "B"]
+    assert readName(folder, "A") == "A"
+    assert readName(folder, "B") == "B"
+    assert not journal.exists()
+
+
+def testRollbackUnexecutedCycle(tmp_path):
+    folder = str(tmp_path / "anime")
+    anime_list = [makeAnime(folder, "A", "B"), makeAnime(folder, "B", "C"), makeAnime(folder, "C", "A")]
+    journal = makeJournal(tmp_path)
+    interrupt(journal, RenamePlan(anime_list).moves, 0)
+
+    Rename.rollback(journal)
+
+    assert sorted(os.listdir(folder)) == ["A", "B", "C"]
+    for name in "ABC":
+        assert readName(folder, name) == name
+
+
+def testRollbackPartlyExecutedCycle(tmp_path):
+    folder = str(tmp_path / "anime")
+    anime_list = [makeAnime(folder, "A", "B"), makeAnime(folder, "B", "C"), makeAnime(folder, "C", "A")]
+    moves = RenamePlan(anime_list).moves
+    assert len(moves) == 4
+
+    # 已记录两次重命名，第三次已完成但未来得及记录
+    journal = makeJournal(tmp_path)
+    interrupt(journal, moves, 2, started=2)
+
+    Rename.rollback(journal)
+
+    assert sorted(os.listdir(folder)) == ["A", "B", "C"]
+    for name in "ABC":
+        assert readName(folder, name) == name
+
+
+def testResumePartlyExecutedCycle(tmp_path):
+    folder = str(tmp_path / "anime")
+    anime_list = [makeAnime(folder, "A", "B"), makeAnime(folder, "B", "C"), makeAnime(folder, "C", "A")]
+    journal = makeJournal(tmp_path)
+    interrupt(journal, RenamePlan(anime_list).moves, 1, started=1)
+
+    Rename.resume(journal)
+
+    assert sorted(os.listdir(folder)) == ["A", "B", "C"]
+    assert readName(folder, "B") == "A"
+    assert readName(folder, "C") == "B"
+    assert readName(folder, "A") == "C"